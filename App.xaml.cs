@@ -1,6 +1,6 @@
+using System.Buffers;
 using System.IO;
 using System.Text.Json;
-using System.Threading.Channels;
 using System.Windows;
 using Microsoft.Extensions.FileProviders;
 using System.Reflection;
@@ -8,8 +8,10 @@ using LandingJudge.Services;
 using Microsoft.AspNetCore.Builder;
 using Microsoft.AspNetCore.Hosting;
 using Microsoft.AspNetCore.Http;
+using Microsoft.AspNetCore.Http.Features;
 using Microsoft.Extensions.DependencyInjection;
 using Microsoft.Extensions.Hosting;
+using Microsoft.Extensions.Logging;
 
 namespace LandingJudge;
 
@@ -33,15 +35,18 @@ public partial class App : Application
 
             // ... existing host setup ...
             var builder = Host.CreateDefaultBuilder()
+                // Default Information level logs two lines per request to providers nobody reads in a desktop app.
+                .ConfigureLogging(logging => logging.SetMinimumLevel(LogLevel.Warning))
                 .ConfigureWebHostDefaults(webBuilder =>
                 {
                     // Late-bind Kestrel to port from .env (default 5000)
                     webBuilder.UseKestrel((context, options) =>
                     {
-                        var envService = new EnvService();
-                        envService.Load();
+                        // The shared instance has already read .env; no second parse just for the port.
+                        var envService = options.ApplicationServices.GetRequiredService<EnvService>();
                         var port = envService.GetInt("PORT", 5000);
                         options.ListenAnyIP(port);
+                        options.AddServerHeader = false;
                     });
                     webBuilder.ConfigureServices(services =>
                     {
@@ -74,7 +79,15 @@ public partial class App : Application
                         app.UseStaticFiles(new StaticFileOptions
                         {
                             FileProvider = physicalProvider,
-                            RequestPath = "/static/audio"
+                            RequestPath = "/static/audio",
+                            OnPrepareResponse = ctx =>
+                            {
+                                // Clip names embed a hash of the text and voice, so a given URL never changes content.
+                                if (ctx.File.Name.StartsWith("quote_", StringComparison.Ordinal))
+                                {
+                                    ctx.Context.Response.Headers.CacheControl = "public, max-age=31536000, immutable";
+                                }
+                            }
                         });
                         
                         app.UseRouting();
@@ -100,46 +113,60 @@ public partial class App : Application
                                 context.Response.Headers.Append("Content-Type", "text/event-stream");
                                 context.Response.Headers.Append("Cache-Control", "no-cache");
                                 context.Response.Headers.Append("Connection", "keep-alive");
+                                context.Features.Get<IHttpResponseBodyFeature>()?.DisableBuffering();
 
-                                var channel = Channel.CreateUnbounded<string>();
-
-                                void Handler(string type, string data)
-                                {
-                                    channel.Writer.TryWrite($"data: {data}\n\n");
-                                }
+                                // Only events broadcast after this point are streamed to this client.
+                                var lastSeen = voteService.Sequence;
 
-                                voteService.OnEvent += Handler;
+                                // Frames are copied into the response pipe and sent with one flush per wake-up,
+                                // so a burst of events goes out as a single chunk rather than one write each.
+                                var writer = context.Response.BodyWriter;
 
                                 // Send initial theme/settings snapshot so overlay updates immediately.
                                 try
                                 {
                                     var env = app.ApplicationServices.GetRequiredService<EnvService>();
-                                    env.Load();
+                                    env.ReloadIfChanged();
 
-                                    var settingsPayload = BuildSettingsPayload(env);
-                                    channel.Writer.TryWrite($"data: {JsonSerializer.Serialize(settingsPayload)}\n\n");
+                                    var settingsPayload = SettingsPayload.FromEnv(env);
+                                    writer.Write(VoteService.FormatSseFrame(settingsPayload));
 
-                                    var themePayload = BuildThemePayload(env);
-                                    channel.Writer.TryWrite($"data: {JsonSerializer.Serialize(themePayload)}\n\n");
+                                    var themePayload = ThemePayload.FromEnv(env);
+                                    writer.Write(VoteService.FormatSseFrame(themePayload));
                                 }
                                 catch { /* ignore */ }
 
-                                await context.Response.Body.FlushAsync(ct);
+                                await writer.FlushAsync(ct);
 
+                                var pending = new List<byte[]>();
+                                Task? signal = null;
                                 try
                                 {
                                     while (!ct.IsCancellationRequested)
                                     {
-                                        var msg = await channel.Reader.ReadAsync(ct);
-                                        await context.Response.WriteAsync(msg, ct);
-                                        await context.Response.Body.FlushAsync(ct);
+                                        // The same signal is awaited across keep-alives and only replaced once it has fired.
+                                        // An idle interval is the common case, so check for it instead of catching a TimeoutException.
+                                        signal ??= voteService.WaitForEventAsync(lastSeen);
+                                        await signal.WaitAsync(VoteService.KeepAliveInterval, ct).ConfigureAwait(ConfigureAwaitOptions.SuppressThrowing);
+                                        if (ct.IsCancellationRequested) break;
+                                        if (!signal.IsCompleted)
+                                        {
+                                            writer.Write(VoteService.KeepAliveFrame);
+                                            await writer.FlushAsync(ct);
+                                            continue;
+                                        }
+
+                                        signal = null;
+                                        pending.Clear();
+                                        lastSeen = voteService.ReadSince(lastSeen, pending);
+                                        foreach (var frame in pending)
+                                        {
+                                            writer.Write(frame);
+                                        }
+                                        await writer.FlushAsync(ct);
                                     }
                                 }
                                 catch (OperationCanceledException) { }
-                                finally
-                                {
-                                    voteService.OnEvent -= Handler;
-                                }
                             });
 
                             endpoints.MapPost("/theme", async (HttpContext context, EnvService env) =>
@@ -150,7 +177,7 @@ public partial class App : Application
                                     var deg = Math.Clamp(body.hue_deg, 0, 360);
                                     env.Set("OVERLAY_HUE_DEG", deg.ToString());
 
-                                    var payload = BuildThemePayload(env);
+                                    var payload = ThemePayload.FromEnv(env);
                                     var vs = context.RequestServices.GetRequiredService<VoteService>();
                                     vs.Broadcast(payload.type, payload);
                                     return Results.Ok(new { ok = true, hue_deg = deg });
@@ -167,7 +194,7 @@ public partial class App : Application
                                 {
                                     var body = await JsonSerializer.DeserializeAsync<PreviewRequest>(context.Request.Body) ?? new PreviewRequest();
                                     var score = Math.Clamp(body.score, 1, 10);
-                                    var payload = new { type = "preview", active = body.active, score = score };
+                                    var payload = new PreviewPayload { active = body.active, score = score };
                                     voteService.Broadcast("preview", payload);
                                     return Results.Ok(new { ok = true, active = body.active, score });
                                 }
@@ -177,48 +204,16 @@ public partial class App : Application
                                 }
                             });
 
-                            endpoints.MapGet("/vote/{score:int}", async (int score, VoteService voteService, QuoteService quoteService, TtsService ttsService, EnvService env) =>
+                            endpoints.MapPost("/reload-quotes", (QuoteService quoteService) =>
                             {
-                                env.Load(); // Reload latest changes saved via UI or file edits.
-
-                                if (score < 1) score = 1;
-                                if (score > 10) score = 10;
-
-                                var (quote, message) = quoteService.GetQuote(score);
-                                var tier = quoteService.GetTier(score);
-                                
-                                var enableTts = env.GetBool("ENABLE_TTS", true);
-                                var enableBell = env.GetBool("ENABLE_DINGDONG", true);
-                                var audioUrl = enableTts ? await ttsService.GenerateAudioUrlAsync(quote) : "";
-
-                                int durationMs = env.GetInt("BANNER_DURATION_MS", 8000);
+                                // Quotes are cached in memory; re-read quotes.json after manual edits.
+                                quoteService.LoadQuotes();
+                                return Results.Ok(new { ok = true });
+                            });
 
-                                // Audio effects / noise levels
-                                var effects = new
-                                {
-                                    static_noise = env.GetBool("ADD_STATIC_NOISE", false),
-                                    preset = env.Get("EFFECT_PRESET", "none"),
-                                    static_noise_level = env.GetDouble("STATIC_NOISE_LEVEL", 0.0),
-                                    radio_noise_level = env.GetDouble("RADIO_NOISE_LEVEL", 0.0),
-                                    wind_noise_level = env.GetDouble("WIND_NOISE_LEVEL", 0.0)
-                                };
-
-                                var payload = new
-                                {
-                                    type = "vote",
-                                    score = score,
-                                    level = tier,
-                                    quote = quote,
-                                    message = message,
-                                    audio_url = audioUrl,
-                                    duration_ms = durationMs,
-                                    enable_tts = enableTts,
-                                    enable_dingdong = enableBell,
-                                    effects,
-                                    ts = DateTime.UtcNow.ToString("yyyy-MM-ddTHH:mm:ssZ")
-                                };
-
-                                voteService.Broadcast("vote", payload);
+                            endpoints.MapGet("/vote/{score:int}", async (int score, VoteService voteService, QuoteService quoteService, TtsService ttsService, EnvService env) =>
+                            {
+                                var payload = await voteService.CastVoteAsync(score, quoteService, ttsService, env);
                                 return Results.Ok(payload);
                             });
                             
@@ -230,10 +225,16 @@ public partial class App : Application
 
             AppHost = builder.Build();
             File.AppendAllText("debug.log", $"[{DateTime.Now}] Host built. Starting...\n");
-            await AppHost.StartAsync();
-            File.AppendAllText("debug.log", $"[{DateTime.Now}] Host started. Opening MainWindow...\n");
+            // Kestrel binds on the pool while the window is constructed, but the window is only shown
+            // once the server is up: a port conflict reports its error without a half-alive main window.
+            var host = AppHost;
+            var hostStart = Task.Run(() => host.StartAsync());
 
             _mainWindow = new MainWindow();
+
+            await hostStart;
+            File.AppendAllText("debug.log", $"[{DateTime.Now}] Host started. Opening MainWindow...\n");
+
             _mainWindow.Show();
             File.AppendAllText("debug.log", $"[{DateTime.Now}] MainWindow shown.\n");
         }
@@ -263,42 +264,11 @@ public partial class App : Application
         base.OnExit(e);
     }
 
-    private static object BuildSettingsPayload(EnvService env)
-    {
-        return new
-        {
-            type = "settings",
-            enable_tts = env.GetBool("ENABLE_TTS", true),
-            enable_dingdong = env.GetBool("ENABLE_DINGDONG", true),
-            effects = new
-            {
-                static_noise = env.GetBool("ADD_STATIC_NOISE", false),
-                preset = env.Get("EFFECT_PRESET", "none"),
-                static_noise_level = env.GetDouble("STATIC_NOISE_LEVEL", 0.0),
-                radio_noise_level = env.GetDouble("RADIO_NOISE_LEVEL", 0.0),
-                wind_noise_level = env.GetDouble("WIND_NOISE_LEVEL", 0.0)
-            }
-        };
-    }
-
-    private static ThemePayload BuildThemePayload(EnvService env)
-    {
-        var hue = env.GetInt("OVERLAY_HUE_DEG", 0);
-        hue = Math.Clamp(hue, 0, 360);
-        return new ThemePayload { type = "theme", hue_deg = hue };
-    }
-
     private record ThemeRequest
     {
         public int hue_deg { get; set; } = 0;
     }
 
-    private record ThemePayload
-    {
-        public string type { get; set; } = "theme";
-        public int hue_deg { get; set; }
-    }
-
     private record PreviewRequest
     {
         public bool active { get; set; } = false;
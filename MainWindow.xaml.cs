@@ -1,7 +1,10 @@
 using System;
+using System.Collections.Concurrent;
 using System.Diagnostics;
+using System.Globalization;
 using System.IO;
 using System.Linq;
+using System.Text;
 using System.Windows;
 using System.Windows.Controls;
 using System.Windows.Media;
@@ -19,6 +22,22 @@ public partial class MainWindow : Window
     private TtsService? _ttsService;
     private int _port = 5000;
     private DispatcherTimer _saveTimer;
+    // Log lines received while the Live Events panel is hidden (UI thread only).
+    private readonly Queue<string> _hiddenLog = new();
+    private const int HiddenLogLimit = 200;
+    // Lines the visible Live Events box may hold before its oldest lines are dropped.
+    private const int EventsLogLimit = 500;
+    private int _eventsLogLines;
+    // Lines waiting for the next dispatcher drain; AppendLog may be called from any thread.
+    private readonly ConcurrentQueue<string> _pendingLog = new();
+    private int _logDrainScheduled;
+    // Set while LoadSettings fills the controls so their change handlers don't save or re-layout per control.
+    private bool _loadingSettings;
+    // Tag of the checked effect radio, kept by Effect_Checked so readers needn't scan the panel.
+    private string _selectedPreset = "none";
+    private SettingsPayload? _lastSettingsPayload;
+    // Presets that mix in background noise, so the level slider applies to them.
+    private static readonly HashSet<string> NoisyPresets = new() { "atc_radio", "apron_outdoor" };
     
     public MainWindow()
     {
@@ -42,6 +61,8 @@ public partial class MainWindow : Window
 
         if (_voteService != null)
         {
+            // Covers votes from /vote as well as the buttons; AppendLog is safe from any thread.
+            _voteService.OnTtsError += ex => AppendLog($"Error generating TTS: {ex.Message}");
             AppendLog("Application started.");
             _port = _env?.GetInt("PORT", 5000) ?? 5000;
             AppendLog($"Server running on port {_port}");
@@ -53,6 +74,8 @@ public partial class MainWindow : Window
     private void MainWindow_Closing(object? sender, System.ComponentModel.CancelEventArgs e)
     {
         SaveSettings();
+        _env?.Flush(); // .env is written in the background; don't exit with the last save still queued
+        _ttsService?.FlushIndex(); // Likewise the debounced audio index save
     }
 
     private void AppendLog(string message)
@@ -66,20 +89,89 @@ public partial class MainWindow : Window
         catch {}
         */
 
-        Dispatcher.Invoke(() =>
+        _pendingLog.Enqueue($"[{DateTime.Now:HH:mm:ss}] {message}\n");
+
+        // One dispatcher hop per burst; lines queued before it runs are written together.
+        if (Interlocked.Exchange(ref _logDrainScheduled, 1) == 0)
+        {
+            Dispatcher.BeginInvoke(DispatcherPriority.Background, new Action(DrainPendingLog));
+        }
+    }
+
+    private void DrainPendingLog()
+    {
+        Volatile.Write(ref _logDrainScheduled, 0);
+        if (_pendingLog.IsEmpty || EventsLog == null) return;
+
+        // While the panel is collapsed, keep the latest lines aside instead of growing the TextBox.
+        if (EventsGroup?.Visibility != Visibility.Visible)
         {
-            if (EventsLog != null)
+            while (_pendingLog.TryDequeue(out var hidden))
             {
-                EventsLog.AppendText($"[{DateTime.Now:HH:mm:ss}] {message}\n");
-                EventsLog.ScrollToEnd();
+                _hiddenLog.Enqueue(hidden);
+                if (_hiddenLog.Count > HiddenLogLimit) _hiddenLog.Dequeue();
             }
-        });
+            return;
+        }
+
+        var text = new StringBuilder();
+        var lines = 0;
+        while (_pendingLog.TryDequeue(out var line))
+        {
+            text.Append(line);
+            lines++;
+        }
+        WriteEventsLog(text.ToString(), lines);
+    }
+
+    private void FlushHiddenLog()
+    {
+        if (EventsLog == null || _hiddenLog.Count == 0) return;
+        WriteEventsLog(string.Concat(_hiddenLog), _hiddenLog.Count);
+        _hiddenLog.Clear();
+    }
+
+    // Appends whole lines and keeps the box bounded. Trimming back to HiddenLogLimit lines
+    // only once it passes EventsLogLimit keeps the cost of cutting the text rare.
+    private void WriteEventsLog(string text, int lines)
+    {
+        if (EventsLog == null) return;
+
+        EventsLog.AppendText(text);
+        _eventsLogLines += lines;
+        if (_eventsLogLines > EventsLogLimit)
+        {
+            var current = EventsLog.Text;
+            var cut = 0;
+            for (var drop = _eventsLogLines - HiddenLogLimit; drop > 0; drop--)
+            {
+                cut = current.IndexOf('\n', cut) + 1;
+            }
+            EventsLog.Text = current.Substring(cut);
+            _eventsLogLines = HiddenLogLimit;
+        }
+        EventsLog.ScrollToEnd();
     }
 
     private void LoadSettings()
     {
-        _env?.Load();
+        _env?.ReloadIfChanged(); // Already loaded when the service was created
+
+        _loadingSettings = true;
+        try
+        {
+            ApplySettingsToControls();
+        }
+        finally
+        {
+            _loadingSettings = false;
+        }
+
+        UpdateNoiseVisibility();
+    }
 
+    private void ApplySettingsToControls()
+    {
         _port = _env?.GetInt("PORT", 5000) ?? 5000;
 
         if (DingCheck != null) 
@@ -116,34 +208,16 @@ public partial class MainWindow : Window
             if (val > 5.0) val = 5.0;
             NoiseSlider.Value = val;
         }
-
-        UpdateNoiseVisibility();
     }
 
     private void UpdateNoiseVisibility()
     {
-        if (NoiseSettingsGrid == null || StaticOnlyCheck == null || EffectsPanel == null) return;
+        if (_loadingSettings) return;
+        if (NoiseSettingsGrid == null || StaticOnlyCheck == null) return;
 
-        bool show = false;
-        string preset = "none";
-        
-        foreach (var child in EffectsPanel.Children)
-        {
-            if (child is RadioButton rb && rb.IsChecked == true)
-            {
-                preset = rb.Tag?.ToString() ?? "none";
-                break;
-            }
-        }
-
-        if (preset == "atc_radio" || preset == "apron_outdoor")
-        {
-            show = true;
-        }
-        else if (preset == "none" && StaticOnlyCheck.IsChecked == true)
-        {
-            show = true;
-        }
+        var preset = _selectedPreset;
+        bool show = NoisyPresets.Contains(preset)
+            || (preset == "none" && StaticOnlyCheck.IsChecked == true);
 
         NoiseSettingsGrid.Visibility = show ? Visibility.Visible : Visibility.Collapsed;
     }
@@ -152,53 +226,31 @@ public partial class MainWindow : Window
     {
         if (_env == null) return;
         
-        _env.Set("ENABLE_DINGDONG", DingCheck?.IsChecked == true ? "true" : "false");
-        _env.Set("SHOW_EVENTS_LOG", LogCheck?.IsChecked == true ? "true" : "false");
-        
-        string preset = "none";
-        if (EffectsPanel != null)
-        {
-            foreach (var child in EffectsPanel.Children)
-            {
-                if (child is RadioButton rb && rb.IsChecked == true)
-                {
-                    preset = rb.Tag?.ToString() ?? "none";
-                    break;
-                }
-            }
-        }
-        _env.Set("EFFECT_PRESET", preset);
-        _env.Set("ADD_STATIC_NOISE", StaticOnlyCheck?.IsChecked == true ? "true" : "false");
-        
-        double noiseVal = (NoiseSlider?.Value ?? 0) / 100.0;
-        _env.Set("STATIC_NOISE_LEVEL", noiseVal.ToString());
-        _env.Set("RADIO_NOISE_LEVEL", noiseVal.ToString());
-        _env.Set("WIND_NOISE_LEVEL", noiseVal.ToString());
+        // Formatted once for all three levels; invariant so .env reads the same on every locale.
+        var noiseVal = Math.Round((NoiseSlider?.Value ?? 0) / 100.0, 3).ToString(CultureInfo.InvariantCulture);
+        _env.SetMany(
+            ("ENABLE_DINGDONG", DingCheck?.IsChecked == true ? "true" : "false"),
+            ("SHOW_EVENTS_LOG", LogCheck?.IsChecked == true ? "true" : "false"),
+            ("EFFECT_PRESET", _selectedPreset),
+            ("ADD_STATIC_NOISE", StaticOnlyCheck?.IsChecked == true ? "true" : "false"),
+            ("STATIC_NOISE_LEVEL", noiseVal),
+            ("RADIO_NOISE_LEVEL", noiseVal),
+            ("WIND_NOISE_LEVEL", noiseVal));
     }
 
     private void BroadcastSettings()
     {
-        _env?.Load();
-        var enableTts = _env?.GetBool("ENABLE_TTS", true) ?? true;
-        var addStaticNoise = _env?.GetBool("ADD_STATIC_NOISE", false) ?? false;
-        var preset = _env?.Get("EFFECT_PRESET", "none") ?? "none";
-        var noiseLevel = _env?.GetDouble("STATIC_NOISE_LEVEL", 0.0) ?? 0.0;
+        if (_env == null) return;
+        _env.ReloadIfChanged();
+        var settingsPayload = SettingsPayload.FromEnv(_env);
 
-        var settingsPayload = new
+        // Saves that didn't change anything the overlay uses (e.g. the log toggle) aren't re-sent;
+        // newly connected overlays get the current settings from /stream's snapshot.
+        if (settingsPayload != _lastSettingsPayload)
         {
-            type = "settings",
-            enable_tts = enableTts,
-            enable_dingdong = DingCheck?.IsChecked == true,
-            effects = new
-            {
-                static_noise = addStaticNoise,
-                preset = preset,
-                static_noise_level = noiseLevel,
-                radio_noise_level = noiseLevel,
-                wind_noise_level = noiseLevel
-            }
-        };
-        _voteService?.Broadcast("settings", settingsPayload);
+            _voteService?.Broadcast("settings", settingsPayload);
+            _lastSettingsPayload = settingsPayload;
+        }
         
         if (StatusText != null) StatusText.Text = "Settings saved.";
     }
@@ -212,6 +264,7 @@ public partial class MainWindow : Window
 
     private void TriggerSave()
     {
+        if (_loadingSettings) return;
         _saveTimer?.Stop();
         _saveTimer?.Start();
     }
@@ -220,7 +273,7 @@ public partial class MainWindow : Window
 
     private void OpenSettings_Click(object sender, RoutedEventArgs e)
     {
-        var settingsWin = new SettingsWindow(_env);
+        var settingsWin = new SettingsWindow(_env, _ttsService);
         settingsWin.Owner = this;
         if (settingsWin.ShowDialog() == true)
         {
@@ -238,19 +291,16 @@ public partial class MainWindow : Window
         try { Process.Start(new ProcessStartInfo(url) { UseShellExecute = true }); } catch { }
     }
 
-    private void StaticOnly_Checked(object sender, RoutedEventArgs e) 
-    {
-        UpdateNoiseVisibility();
-        TriggerSave();
-    }
-    private void StaticOnly_Unchecked(object sender, RoutedEventArgs e) 
+    private void StaticOnly_Changed(object sender, RoutedEventArgs e) 
     {
         UpdateNoiseVisibility();
         TriggerSave();
     }
 
+    // The radios share a panel, so WPF keeps them exclusive and only the newly checked one raises Checked.
     private void Effect_Checked(object sender, RoutedEventArgs e) 
     {
+        if (e.OriginalSource is RadioButton rb) _selectedPreset = rb.Tag?.ToString() ?? "none";
         UpdateNoiseVisibility();
         TriggerSave();
     }
@@ -267,21 +317,28 @@ public partial class MainWindow : Window
     {
         if (EventsGroup != null) 
             EventsGroup.Visibility = (LogCheck?.IsChecked == true) ? Visibility.Visible : Visibility.Collapsed;
+        if (EventsGroup?.Visibility == Visibility.Visible) FlushHiddenLog();
         TriggerSave();
     }
 
+    // Settings restored by Reset Defaults; everything else in .env is left alone.
+    private static readonly (string Key, string Value)[] ResetDefaultValues =
+    {
+        ("PORT", "5000"),
+        ("TTS_PROVIDER", "System"),
+        ("ENABLE_TTS", "true"),
+        ("ENABLE_DINGDONG", "true"),
+        ("SHOW_EVENTS_LOG", "false"),
+        ("EFFECT_PRESET", "none"),
+        ("STATIC_NOISE_LEVEL", "0")
+    };
+
     private void ResetDefaults_Click(object sender, RoutedEventArgs e)
     {
         if (MessageBox.Show("Reset all settings to default?", "Confirm", MessageBoxButton.YesNo) == MessageBoxResult.Yes)
         {
-            // Simple reset: delete env vars or just set known defaults
-            _env?.Set("PORT", "5000");
-            _env?.Set("TTS_PROVIDER", "System");
-            _env?.Set("ENABLE_TTS", "true");
-            _env?.Set("ENABLE_DINGDONG", "true");
-            _env?.Set("SHOW_EVENTS_LOG", "false");
-            _env?.Set("EFFECT_PRESET", "none");
-            _env?.Set("STATIC_NOISE_LEVEL", "0");
+            // Simple reset: write the known defaults, then reload the controls from them
+            _env?.SetMany(ResetDefaultValues);
             LoadSettings();
             BroadcastSettings();
         }
@@ -298,40 +355,34 @@ public partial class MainWindow : Window
         var current = _env?.GetInt("OVERLAY_HUE_DEG", 0) ?? 0;
         var newHue = (current + 45) % 360;
         _env?.Set("OVERLAY_HUE_DEG", newHue.ToString());
-        _voteService?.Broadcast("theme", new { type = "theme", hue_deg = newHue });
+        _voteService?.Broadcast("theme", new ThemePayload { hue_deg = newHue });
         AppendLog($"Hue changed to {newHue}°");
     }
 
     private void EditQuotes_Click(object sender, RoutedEventArgs e)
     {
-        try { Process.Start(new ProcessStartInfo("notepad.exe", "quotes.json") { UseShellExecute = true }); } catch { }
+        // Open the same file QuoteService reads; it reloads automatically once saved.
+        var path = Path.Combine(AppContext.BaseDirectory, "quotes.json");
+        try { Process.Start(new ProcessStartInfo("notepad.exe", $"\"{path}\"") { UseShellExecute = true }); } catch { }
     }
 
-    private void ClearCache_Click(object sender, RoutedEventArgs e)
+    private async void ClearCache_Click(object sender, RoutedEventArgs e)
     {
         if (MessageBox.Show("Clear audio cache?", "Confirm", MessageBoxButton.YesNo) == MessageBoxResult.Yes)
         {
              // Delete mp3/wav files in audio_cache
              try
              {
-                 var path = Path.Combine(AppContext.BaseDirectory, "audio_cache");
-                 if (Directory.Exists(path))
+                 var ttsService = _ttsService;
+                 if (ttsService != null)
                  {
-                     int count = 0;
-                     foreach (var file in Directory.GetFiles(path, "quote_*.*"))
-                     {
-                         try 
-                         {
-                             File.Delete(file);
-                             count++;
-                         }
-                         catch { /* ignore locked files */ }
-                     }
+                     // A large cache can take a while to delete; keep the window responsive.
+                     int count = await Task.Run(ttsService.ClearCache);
                      AppendLog($"Audio cache cleared. Removed {count} files.");
                  }
                  else
                  {
-                     AppendLog("Cache directory not found.");
+                     AppendLog("TTS service not available.");
                  }
              }
              catch (Exception ex)
@@ -343,56 +394,13 @@ public partial class MainWindow : Window
 
     private async void Vote_Click(object sender, RoutedEventArgs e)
     {
-        if (_voteService == null || _quoteService == null) return;
+        if (_voteService == null || _quoteService == null || _env == null) return;
 
-        if (sender is Button btn && int.TryParse(btn.Tag?.ToString(), out int score))
+        // One handler on the grid for all ten buttons; the clicked button is the original source.
+        if (e.OriginalSource is Button btn && int.TryParse(btn.Tag?.ToString(), out int score))
         {
-            score = Math.Clamp(score, 1, 10);
-            var (quote, message) = _quoteService.GetQuote(score);
-            var tier = _quoteService.GetTier(score);
-
-            _env?.Load();
-            var enableTts = _env?.GetBool("ENABLE_TTS", true) ?? true;
-            var enableBell = _env?.GetBool("ENABLE_DINGDONG", true) ?? true;
-            var durationMs = _env?.GetInt("BANNER_DURATION_MS", 8000) ?? 8000;
-
-            var audioUrl = "";
-            if (enableTts && _ttsService != null)
-            {
-                try 
-                {
-                    audioUrl = await _ttsService.GenerateAudioUrlAsync(quote);
-                }
-                catch (Exception ex)
-                {
-                    AppendLog($"Error generating TTS: {ex.Message}");
-                }
-            }
-
-            var effects = new
-            {
-                static_noise = _env?.GetBool("ADD_STATIC_NOISE", false) ?? false,
-                preset = _env?.Get("EFFECT_PRESET", "none") ?? "none",
-                static_noise_level = _env?.GetDouble("STATIC_NOISE_LEVEL", 0.0) ?? 0.0,
-                radio_noise_level = _env?.GetDouble("RADIO_NOISE_LEVEL", 0.0) ?? 0.0,
-                wind_noise_level = _env?.GetDouble("WIND_NOISE_LEVEL", 0.0) ?? 0.0
-            };
-
-            var payload = new
-            {
-                type = "vote",
-                score = score,
-                level = tier,
-                quote = quote,
-                message = message,
-                audio_url = audioUrl,
-                duration_ms = durationMs,
-                enable_tts = enableTts,
-                enable_dingdong = enableBell,
-                effects
-            };
-            _voteService.Broadcast("vote", payload);
-            AppendLog($"Vote broadcast: Score {score} ({tier})");
+            var payload = await _voteService.CastVoteAsync(score, _quoteService, _ttsService, _env);
+            AppendLog($"Vote broadcast: Score {payload.score} ({payload.level})");
         }
     }
 }
@@ -1,14 +1,37 @@
 using System;
+using System.Collections.Frozen;
 using System.Collections.Generic;
+using System.Globalization;
 using System.IO;
 using System.Linq;
 
 namespace LandingJudge.Services;
 
-public class EnvService
+public class EnvService : IDisposable
 {
-    private readonly Dictionary<string, string> _values = new();
+    // Any other non-empty value reads as false.
+    private static readonly FrozenSet<string> TrueValues =
+        new[] { "1", "true", "yes", "on" }.ToFrozenSet(StringComparer.OrdinalIgnoreCase);
+
+    // Keys match case-insensitively, like Windows environment variables and Persist's line matching.
+    private readonly Dictionary<string, string> _values = new(StringComparer.OrdinalIgnoreCase);
+    // Raw lines from the last Load; Persist rewrites these instead of re-reading the file.
+    private readonly List<string> _lines = new();
+    // Values set since the last write; a reload re-applies them so queued saves aren't lost.
+    private readonly Dictionary<string, string> _pendingChanges = new(StringComparer.OrdinalIgnoreCase);
+    // Guards _values, _lines, _pendingChanges and _loadedWriteTimeUtc: saves come from the UI thread,
+    // /theme and reloads from Kestrel threads. Never held while waiting for _fileLock.
+    private readonly object _stateLock = new();
     private readonly string? _envPath;
+    // Write time of .env as of the last Load or Persist, used to skip re-reading an unchanged file.
+    private DateTime _loadedWriteTimeUtc;
+    private int _version;
+    // Serializes writers of .env; taken before _stateLock when both are needed.
+    private readonly object _fileLock = new();
+    private int _writeScheduled;
+
+    // Bumped whenever a value may have changed, so callers can cache values derived from settings.
+    public int Version => Volatile.Read(ref _version);
 
     public EnvService()
     {
@@ -35,17 +58,55 @@ public class EnvService
 
     public void Load()
     {
-        _values.Clear();
-
-        if (_envPath != null && File.Exists(_envPath))
+        lock (_stateLock)
         {
-            foreach (var line in File.ReadAllLines(_envPath))
+            Interlocked.Increment(ref _version);
+            _values.Clear();
+            _lines.Clear();
+
+            if (_envPath == null) return;
+            if (File.Exists(_envPath))
             {
-                ParseLine(line);
+                _lines.AddRange(File.ReadAllLines(_envPath));
+                foreach (var line in _lines)
+                {
+                    ParseLine(line);
+                }
+            }
+            // A missing file reports a fixed 1601 timestamp, so recording it here keeps
+            // ReloadIfChanged from re-loading (and bumping Version) on every call until it appears.
+            _loadedWriteTimeUtc = File.GetLastWriteTimeUtc(_envPath);
+
+            // A save still queued for the background writer is newer than the file: keep it on top
+            // of what was just read and let the writer persist it, rather than writing here.
+            if (_pendingChanges.Count > 0)
+            {
+                foreach (var (key, value) in _pendingChanges)
+                {
+                    _values[key] = value;
+                }
+                ApplyToLines(_lines, _pendingChanges);
             }
         }
     }
 
+    // Values set through this service are already in memory; only re-read .env when it
+    // was edited outside the app since the last Load.
+    public void ReloadIfChanged()
+    {
+        if (_envPath == null) return;
+        DateTime loadedWriteTimeUtc;
+        lock (_stateLock)
+        {
+            // A queued save doesn't block this: Load keeps pending values on top of a hand edit.
+            loadedWriteTimeUtc = _loadedWriteTimeUtc;
+        }
+        if (File.GetLastWriteTimeUtc(_envPath) != loadedWriteTimeUtc)
+        {
+            Load();
+        }
+    }
+
     private void ParseLine(string line)
     {
         var trimmed = line.Trim();
@@ -70,74 +131,165 @@ public class EnvService
 
     public string Get(string key, string defaultValue = "")
     {
-        return _values.TryGetValue(key, out var val) ? val : defaultValue;
+        return TryGetValue(key, out var val) ? val : defaultValue;
+    }
+
+    private bool TryGetValue(string key, out string value)
+    {
+        lock (_stateLock)
+        {
+            return _values.TryGetValue(key, out value!);
+        }
     }
 
+    // The typed getters parse straight from the stored string: no default-to-string
+    // round trip and no lower-cased copy per call.
     public int GetInt(string key, int defaultValue = 0)
     {
-        var v = Get(key, defaultValue.ToString());
-        return int.TryParse(v, out var parsed) ? parsed : defaultValue;
+        return TryGetValue(key, out var v) && int.TryParse(v, out var parsed) ? parsed : defaultValue;
     }
 
     public double GetDouble(string key, double defaultValue = 0)
     {
-        var v = Get(key, defaultValue.ToString());
-        return double.TryParse(v, out var parsed) ? parsed : defaultValue;
+        if (!TryGetValue(key, out var v)) return defaultValue;
+        // Levels are written invariant; older files may hold the current culture's decimal separator.
+        return double.TryParse(v, NumberStyles.Float, CultureInfo.InvariantCulture, out var parsed)
+            || double.TryParse(v, out parsed) ? parsed : defaultValue;
     }
 
     public bool GetBool(string key, bool defaultValue = false)
     {
-        var val = Get(key);
-        if (string.IsNullOrEmpty(val)) return defaultValue;
-        val = val.ToLowerInvariant();
-        return val == "1" || val == "true" || val == "yes" || val == "on";
+        if (!TryGetValue(key, out var val) || string.IsNullOrEmpty(val)) return defaultValue;
+        return TrueValues.Contains(val);
+    }
+
+    public void Set(string key, string value) => SetMany((key, value));
+
+    // Updates several keys with a single rewrite of .env; skips the write if none changed.
+    public void SetMany(params (string Key, string Value)[] values)
+    {
+        lock (_stateLock)
+        {
+            // Persist rewrites the lines from the last Load, so pick up hand edits to .env first.
+            ReloadIfChanged();
+            var changed = false;
+            foreach (var (key, value) in values)
+            {
+                changed |= Update(key, value);
+            }
+            if (changed) Persist();
+        }
     }
 
-    public void Set(string key, string value)
+    // Callers hold _stateLock.
+    private bool Update(string key, string value)
     {
+        if (_values.TryGetValue(key, out var current) && current == value) return false;
         _values[key] = value;
-        Persist();
+        _pendingChanges[key] = value;
+        Interlocked.Increment(ref _version);
+        return true;
     }
 
+    // Callers hold _stateLock.
     private void Persist()
     {
         if (string.IsNullOrWhiteSpace(_envPath)) return;
 
         try
         {
-            if (!File.Exists(_envPath))
+            ApplyToLines(_lines, _pendingChanges);
+
+            // The file itself is written on the thread pool so saves never stall the UI thread;
+            // saves made while a write is queued collapse into one write of the newest lines.
+            if (Interlocked.Exchange(ref _writeScheduled, 1) == 0)
+            {
+                _ = Task.Run(Flush);
+            }
+        }
+        catch
+        {
+            // Swallow errors; best-effort persistence.
+        }
+    }
+
+    // Rewrites each key's line in place, or appends it; comments, ordering and other keys are kept.
+    private static void ApplyToLines(List<string> lines, Dictionary<string, string> values)
+    {
+        var keys = new HashSet<string>(values.Keys, StringComparer.OrdinalIgnoreCase);
+
+        for (int i = 0; i < lines.Count; i++)
+        {
+            var trimmed = lines[i].Trim();
+            if (string.IsNullOrEmpty(trimmed) || trimmed.StartsWith("#")) continue;
+            var parts = trimmed.Split('=', 2);
+            if (parts.Length != 2) continue;
+            var key = parts[0].Trim();
+            if (keys.Contains(key))
             {
-                File.WriteAllLines(_envPath, _values.Select(kvp => $"{kvp.Key}={kvp.Value}"));
-                return;
+                lines[i] = $"{key}={values[key]}";
+                keys.Remove(key);
             }
+        }
 
-            var lines = File.ReadAllLines(_envPath).ToList();
-            var keys = new HashSet<string>(_values.Keys, StringComparer.OrdinalIgnoreCase);
+        foreach (var missing in keys)
+        {
+            lines.Add($"{missing}={values[missing]}");
+        }
+    }
 
-            for (int i = 0; i < lines.Count; i++)
+    // Writes any queued save now. Called on shutdown so the last save isn't lost.
+    public void Flush()
+    {
+        lock (_fileLock)
+        {
+            Volatile.Write(ref _writeScheduled, 0);
+            if (string.IsNullOrWhiteSpace(_envPath)) return;
+
+            string[] lines;
+            Dictionary<string, string> changes;
+            DateTime loadedWriteTimeUtc;
+            lock (_stateLock)
+            {
+                if (_pendingChanges.Count == 0) return;
+                changes = new Dictionary<string, string>(_pendingChanges, StringComparer.OrdinalIgnoreCase);
+                _pendingChanges.Clear();
+                lines = _lines.ToArray();
+                loadedWriteTimeUtc = _loadedWriteTimeUtc;
+            }
+
+            try
             {
-                var trimmed = lines[i].Trim();
-                if (string.IsNullOrEmpty(trimmed) || trimmed.StartsWith("#")) continue;
-                var parts = trimmed.Split('=', 2);
-                if (parts.Length != 2) continue;
-                var key = parts[0].Trim();
-                if (keys.Contains(key))
+                // .env was edited by hand since it was read: apply our keys to the file as it is now
+                // instead of replacing it with the older lines.
+                var editedOutside = File.GetLastWriteTimeUtc(_envPath) != loadedWriteTimeUtc;
+                if (editedOutside)
                 {
-                    lines[i] = $"{key}={_values[key]}";
-                    keys.Remove(key);
+                    var current = File.Exists(_envPath) ? File.ReadAllLines(_envPath).ToList() : new List<string>();
+                    ApplyToLines(current, changes);
+                    lines = current.ToArray();
                 }
-            }
 
-            foreach (var missing in keys)
+                // Write beside the original and swap it in, so a crash mid-write can't truncate .env.
+                var tempPath = _envPath + ".tmp";
+                File.WriteAllLines(tempPath, lines);
+                File.Move(tempPath, _envPath, overwrite: true);
+
+                // After a merge the stamp is left stale, so the next ReloadIfChanged reads the hand edits back in.
+                if (!editedOutside)
+                {
+                    lock (_stateLock)
+                    {
+                        _loadedWriteTimeUtc = File.GetLastWriteTimeUtc(_envPath);
+                    }
+                }
+            }
+            catch
             {
-                lines.Add($"{missing}={_values[missing]}");
+                // Swallow errors; best-effort persistence.
             }
-
-            File.WriteAllLines(_envPath, lines);
-        }
-        catch
-        {
-            // Swallow errors; best-effort persistence.
         }
     }
+
+    public void Dispose() => Flush();
 }
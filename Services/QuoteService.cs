@@ -6,84 +6,161 @@ namespace LandingJudge.Services;
 
 public class QuoteService
 {
-    private Dictionary<string, List<string>> _quotes = new();
-    private Dictionary<string, string> _messages = new();
-    private readonly Random _rng = new();
+    private const int MaxScore = 10;
+
+    // Tier per score, indexed the same way as the quote tables.
+    private static readonly string[] TiersByScore =
+    {
+        "bad", "bad", "bad", "bad", "ok", "ok", "ok", "good", "good", "great", "great"
+    };
+
+    // Indexed directly by score (1-10); slot 0 is unused. Replaced as a whole on reload
+    // so a vote never sees new quotes paired with old messages.
+    private QuoteTable _table = new(BuildQuoteTable(null), BuildMessageTable(null));
+    private readonly string _path = Path.Combine(AppContext.BaseDirectory, "quotes.json");
+    private FileSystemWatcher? _watcher;
+    // Editors often save in several steps (truncate+write, or write temp and rename);
+    // reparse once things settle instead of on every event.
+    private static readonly TimeSpan ReloadDelay = TimeSpan.FromMilliseconds(300);
+    private Timer? _reloadTimer;
 
     public QuoteService()
     {
-        LoadQuotes();
+        // Defaults are only extracted at startup; a watcher event never writes quotes.json.
+        var defaults = File.Exists(_path) ? null : ExtractDefaultQuotes();
+        if (defaults != null)
+        {
+            // Freshly extracted defaults are parsed from memory rather than read back from disk.
+            try { ApplyQuotes(JsonSerializer.Deserialize<QuoteRoot>(defaults)); } catch { }
+        }
+        else
+        {
+            LoadQuotes();
+        }
+        WatchQuotesFile();
     }
 
-    public void LoadQuotes()
+    // Rebuild the tables when quotes.json is saved, so edits apply without a restart
+    // while votes keep reading from memory.
+    private void WatchQuotesFile()
     {
-        var basePath = AppContext.BaseDirectory;
-        var path = Path.Combine(basePath, "quotes.json");
-        
-        // If quotes.json doesn't exist, try to extract default from embedded resources
-        if (!File.Exists(path))
+        try
         {
-            try
+            _reloadTimer = new Timer(_ => LoadQuotes());
+            _watcher = new FileSystemWatcher(AppContext.BaseDirectory, "quotes.json")
             {
-                var assembly = System.Reflection.Assembly.GetEntryAssembly();
-                using var stream = assembly?.GetManifestResourceStream("LandingJudge.quotes.default.json");
-                if (stream != null)
-                {
-                    using var reader = new StreamReader(stream);
-                    var defaultJson = reader.ReadToEnd();
-                    File.WriteAllText(path, defaultJson);
-                }
-            }
-            catch { /* Ignore extraction error */ }
+                NotifyFilter = NotifyFilters.LastWrite | NotifyFilters.FileName
+            };
+            _watcher.Changed += (_, _) => ScheduleReload();
+            _watcher.Created += (_, _) => ScheduleReload();
+            _watcher.Renamed += (_, _) => ScheduleReload();
+            _watcher.EnableRaisingEvents = true;
         }
+        catch { /* Fall back to manual reload */ }
+    }
+
+    private void ScheduleReload() => _reloadTimer?.Change(ReloadDelay, Timeout.InfiniteTimeSpan);
 
-        if (File.Exists(path))
+    // Writes the embedded quotes.default.json out as quotes.json and returns its contents.
+    private string? ExtractDefaultQuotes()
+    {
+        try
         {
-            try 
+            var assembly = System.Reflection.Assembly.GetEntryAssembly();
+            using var stream = assembly?.GetManifestResourceStream("LandingJudge.quotes.default.json");
+            if (stream == null) return null;
+
+            using var reader = new StreamReader(stream);
+            var json = reader.ReadToEnd();
+            // Swap a complete file into place so the watcher and editors never see a partial quotes.json.
+            // Never overwrite: a quotes.json that appeared in the meantime is the user's.
+            var tempPath = _path + ".tmp";
+            try
             {
-                var json = File.ReadAllText(path);
-                var root = JsonSerializer.Deserialize<QuoteRoot>(json);
-                if (root != null)
-                {
-                    _quotes = root.Quotes ?? new();
-                    _messages = root.Messages ?? new();
-                }
+                File.WriteAllText(tempPath, json);
+                File.Move(tempPath, _path, overwrite: false);
             }
-            catch { /* Log error */ }
+            catch
+            {
+                // Ignore extraction error; the defaults read above are still used
+                try { File.Delete(tempPath); } catch { }
+            }
+            return json;
+        }
+        catch
+        {
+            return null;
+        }
+    }
+
+    // Re-reads quotes.json if it exists. A missing, locked or half-written file leaves the
+    // current quotes in place; the next save triggers another reload.
+    public void LoadQuotes()
+    {
+        try
+        {
+            if (!File.Exists(_path)) return;
+            // Parsed straight from the file's UTF-8 bytes without an intermediate string.
+            using var stream = File.OpenRead(_path);
+            ApplyQuotes(JsonSerializer.Deserialize<QuoteRoot>(stream));
+        }
+        catch { /* Log error */ }
+    }
+
+    private void ApplyQuotes(QuoteRoot? root)
+    {
+        if (root != null)
+        {
+            Volatile.Write(ref _table, new QuoteTable(BuildQuoteTable(root.Quotes), BuildMessageTable(root.Messages)));
         }
     }
 
     public string GetTier(int score)
     {
-        if (score <= 3) return "bad";
-        if (score <= 6) return "ok";
-        if (score <= 8) return "good";
-        return "great";
+        return TiersByScore[Math.Clamp(score, 0, MaxScore)];
     }
 
     public (string Quote, string Message) GetQuote(int score)
     {
-        var s = score.ToString();
-        string quote = "";
-        if (_quotes.TryGetValue(s, out var list) && list.Count > 0)
+        if (score < 1 || score > MaxScore) return ("", "");
+
+        var table = Volatile.Read(ref _table);
+        var list = table.QuotesByScore[score];
+        var quote = list.Length > 0 ? list[Random.Shared.Next(list.Length)] : "";
+        return (quote, table.MessagesByScore[score]);
+    }
+
+    private static string[][] BuildQuoteTable(Dictionary<string, List<string>>? quotes)
+    {
+        var table = new string[MaxScore + 1][];
+        for (int score = 0; score <= MaxScore; score++)
         {
-            quote = list[_rng.Next(list.Count)];
+            table[score] = quotes != null && quotes.TryGetValue(score.ToString(), out var list)
+                ? list.ToArray()
+                : Array.Empty<string>();
         }
-        
-        string message = "";
-        if (_messages.TryGetValue(s, out var msg))
+        return table;
+    }
+
+    private static string[] BuildMessageTable(Dictionary<string, string>? messages)
+    {
+        var table = new string[MaxScore + 1];
+        for (int score = 0; score <= MaxScore; score++)
         {
-            message = msg;
+            table[score] = messages != null && messages.TryGetValue(score.ToString(), out var msg)
+                ? msg
+                : "";
         }
-
-        return (quote, message);
+        return table;
     }
 
+    private sealed record QuoteTable(string[][] QuotesByScore, string[] MessagesByScore);
+
     private class QuoteRoot
     {
         [JsonPropertyName("quotes")]
         public Dictionary<string, List<string>>? Quotes { get; set; }
-        
+
         [JsonPropertyName("messages")]
         public Dictionary<string, string>? Messages { get; set; }
     }
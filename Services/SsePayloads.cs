@@ -0,0 +1,108 @@
+using System.Text.Json.Serialization;
+
+namespace LandingJudge.Services;
+
+// Events pushed to the overlay over /stream. Property names are the JSON field names overlay.js reads.
+
+public record VotePayload
+{
+    public string type { get; set; } = "vote";
+    public int score { get; set; }
+    public string level { get; set; } = "";
+    public string quote { get; set; } = "";
+    public string message { get; set; } = "";
+    public string audio_url { get; set; } = "";
+    public bool audio_pending { get; set; }
+    public long vote_id { get; set; }
+    public int duration_ms { get; set; }
+    public bool enable_tts { get; set; }
+    public bool enable_dingdong { get; set; }
+    public EffectsPayload effects { get; set; } = new();
+    public string ts { get; set; } = "";
+}
+
+public record AudioReadyPayload
+{
+    public string type { get; set; } = "audio_ready";
+    public long vote_id { get; set; }
+    public string audio_url { get; set; } = "";
+}
+
+public record SettingsPayload
+{
+    public string type { get; set; } = "settings";
+    public bool enable_tts { get; set; }
+    public bool enable_dingdong { get; set; }
+    public EffectsPayload effects { get; set; } = new();
+
+    public static SettingsPayload FromEnv(EnvService env) => new()
+    {
+        enable_tts = env.GetBool("ENABLE_TTS", true),
+        enable_dingdong = env.GetBool("ENABLE_DINGDONG", true),
+        effects = EffectsPayload.FromEnv(env)
+    };
+}
+
+public record EffectsPayload
+{
+    public bool static_noise { get; set; }
+    public string preset { get; set; } = "none";
+    public double static_noise_level { get; set; }
+    public double radio_noise_level { get; set; }
+    public double wind_noise_level { get; set; }
+
+    // Effects are sent with every vote but only change when settings do; reuse the last build
+    // until the env's version moves. Payloads are never mutated after construction.
+    private static CachedEffects? _cached;
+
+    public static EffectsPayload FromEnv(EnvService env)
+    {
+        var version = env.Version;
+        var cached = Volatile.Read(ref _cached);
+        if (cached != null && cached.Env == env && cached.Version == version) return cached.Payload;
+
+        var payload = Build(env);
+        Volatile.Write(ref _cached, new CachedEffects(env, version, payload));
+        return payload;
+    }
+
+    private sealed record CachedEffects(EnvService Env, int Version, EffectsPayload Payload);
+
+    private static EffectsPayload Build(EnvService env) => new()
+    {
+        static_noise = env.GetBool("ADD_STATIC_NOISE", false),
+        preset = env.Get("EFFECT_PRESET", "none"),
+        static_noise_level = env.GetDouble("STATIC_NOISE_LEVEL", 0.0),
+        radio_noise_level = env.GetDouble("RADIO_NOISE_LEVEL", 0.0),
+        wind_noise_level = env.GetDouble("WIND_NOISE_LEVEL", 0.0)
+    };
+}
+
+public record ThemePayload
+{
+    public string type { get; set; } = "theme";
+    public int hue_deg { get; set; }
+
+    public static ThemePayload FromEnv(EnvService env) => new()
+    {
+        hue_deg = Math.Clamp(env.GetInt("OVERLAY_HUE_DEG", 0), 0, 360)
+    };
+}
+
+public record PreviewPayload
+{
+    public string type { get; set; } = "preview";
+    public bool active { get; set; }
+    public int score { get; set; }
+}
+
+// Compile-time serializers for the payloads above, so broadcasts skip reflection.
+[JsonSourceGenerationOptions(GenerationMode = JsonSourceGenerationMode.Serialization)]
+[JsonSerializable(typeof(VotePayload))]
+[JsonSerializable(typeof(AudioReadyPayload))]
+[JsonSerializable(typeof(SettingsPayload))]
+[JsonSerializable(typeof(ThemePayload))]
+[JsonSerializable(typeof(PreviewPayload))]
+internal partial class SseJsonContext : JsonSerializerContext
+{
+}
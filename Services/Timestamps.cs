@@ -0,0 +1,17 @@
+using System.Globalization;
+
+namespace LandingJudge.Services;
+
+public static class Timestamps
+{
+    // ISO-8601 UTC to the second, e.g. 2024-05-01T12:34:56Z.
+    // "s" is a fixed invariant pattern, so this skips custom format parsing and
+    // isn't affected by the user's culture (':' in a custom format is the local time separator).
+    public static string UtcNowIso()
+    {
+        Span<char> buffer = stackalloc char[20];
+        DateTime.UtcNow.TryFormat(buffer, out var written, "s", CultureInfo.InvariantCulture);
+        buffer[written] = 'Z';
+        return new string(buffer[..(written + 1)]);
+    }
+}
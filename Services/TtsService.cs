@@ -1,9 +1,11 @@
 using System;
+using System.Buffers;
 using System.Collections.Generic;
 using System.IO;
 using System.Security.Cryptography;
 using System.Text;
 using System.Text.Json;
+using System.Threading.Channels;
 using System.Threading.Tasks;
 using Amazon;
 using Amazon.Polly;
@@ -13,12 +15,45 @@ using EdgeTTS;
 
 namespace LandingJudge.Services;
 
-public class TtsService
+public class TtsService : IDisposable
 {
+    // Shared so System.Text.Json can reuse its cached metadata between saves.
+    private static readonly JsonSerializerOptions IndexJsonOptions = new() { WriteIndented = true };
+
+    // Index writes are coalesced: a burst of new clips rewrites audio_index.json once.
+    private static readonly TimeSpan IndexSaveDelay = TimeSpan.FromMilliseconds(500);
+
+    private static readonly TimeSpan VoiceCatalogTtl = TimeSpan.FromHours(1);
+    // The on-disk copy lets a fresh launch list voices without calling AWS; Refresh bypasses it.
+    private static readonly TimeSpan VoiceCatalogDiskTtl = TimeSpan.FromDays(7);
+
+    private const int AudioCopyBufferSize = 64 * 1024;
+
+    // Upper bound for one queued synthesis. Its waiters fail at the deadline and the job's token is
+    // cancelled; the worker still lets the job wind down before starting the next, since Edge's
+    // websocket save can't be cancelled and only one engine session should run at a time.
+    private static readonly TimeSpan SynthesisTimeout = TimeSpan.FromSeconds(30);
+
     private readonly EnvService _env;
     private readonly string _audioDir;
     private readonly string _indexFile;
     private Dictionary<string, AudioIndexEntry> _index = new();
+    private readonly object _indexLock = new();
+    private int _indexSavePending;
+    // Serializes index file writes between the debounced save and an explicit flush on exit.
+    private readonly object _indexFileLock = new();
+    // Index keys whose audio file has been confirmed on disk.
+    private readonly HashSet<string> _verifiedKeys = new();
+    private readonly object _pollyLock = new();
+    private AmazonPollyClient? _pollyClient;
+    private string _pollyClientKey = "";
+    // Created on first use so constructing the service doesn't load the AWS SDK for users who never pick Polly.
+    private Dictionary<string, (List<Voice> Voices, long FetchedAt)>? _pollyVoiceCache;
+    // Engines each voice supports, from the voice catalog or learned from a neural->standard fallback.
+    private readonly Dictionary<(string Region, string Voice), PollyEngines> _pollyVoiceEngines = new();
+    // Synthesis tasks by index key, from enqueue until the worker finishes them.
+    private readonly Dictionary<string, Task<string>> _inFlight = new();
+    private readonly Channel<SynthesisJob> _synthesisQueue = Channel.CreateUnbounded<SynthesisJob>(new UnboundedChannelOptions { SingleReader = true });
 
     public TtsService(EnvService env)
     {
@@ -33,6 +68,8 @@ public class TtsService
         }
         
         LoadIndex();
+
+        _ = Task.Run(ProcessSynthesisQueueAsync);
     }
 
     private void LoadIndex()
@@ -41,21 +78,55 @@ public class TtsService
         {
             try
             {
-                var json = File.ReadAllText(_indexFile);
+                var json = File.ReadAllBytes(_indexFile);
                 _index = JsonSerializer.Deserialize<Dictionary<string, AudioIndexEntry>>(json) ?? new();
             }
             catch { _index = new(); }
         }
     }
 
-    private void SaveIndex()
+    private void AddIndexEntry(string keyHash, AudioIndexEntry entry)
     {
-        try
+        lock (_indexLock)
+        {
+            _index[keyHash] = entry;
+            _verifiedKeys.Add(keyHash);
+        }
+        ScheduleIndexSave();
+    }
+
+    private void ScheduleIndexSave()
+    {
+        if (Interlocked.Exchange(ref _indexSavePending, 1) == 1) return;
+        _ = Task.Delay(IndexSaveDelay).ContinueWith(_ => FlushIndex(), TaskScheduler.Default);
+    }
+
+    // Writes a pending index save now. The main window calls this on close: the host is disposed
+    // from an async OnExit whose continuation doesn't run once WPF has shut down.
+    public void FlushIndex()
+    {
+        lock (_indexFileLock)
         {
-            var json = JsonSerializer.Serialize(_index, new JsonSerializerOptions { WriteIndented = true });
-            File.WriteAllText(_indexFile, json);
+            if (Interlocked.Exchange(ref _indexSavePending, 0) == 0) return;
+            try
+            {
+                byte[] json;
+                lock (_indexLock)
+                {
+                    json = JsonSerializer.SerializeToUtf8Bytes(_index, IndexJsonOptions);
+                }
+                var tempFile = GetTempPath(_indexFile);
+                File.WriteAllBytes(tempFile, json);
+                CommitTempFile(tempFile, _indexFile);
+            }
+            catch { }
         }
-        catch { }
+    }
+
+    public void Dispose()
+    {
+        _synthesisQueue.Writer.TryComplete();
+        FlushIndex();
     }
 
     public async Task<string> GenerateAudioUrlAsync(string text)
@@ -73,47 +144,14 @@ public class TtsService
         {
              var edgeVoiceId = _env.Get("POLLY_VOICE_ID", "en-US-AriaNeural"); // Default Edge voice
             
-             string edgeKeyMaterial = $"{text}|voice={edgeVoiceId}|provider=Edge";
-             string edgeKeyHash = GetMd5Hash(edgeKeyMaterial).Substring(0, 12);
+             string edgeKeyHash = GetAudioKey(text, EdgeKeySuffix(edgeVoiceId));
 
-             if (_index.TryGetValue(edgeKeyHash, out var edgeEntry))
+             if (TryGetCachedUrl(edgeKeyHash, out var edgeUrl))
              {
-                 var path = Path.Combine(_audioDir, edgeEntry.filename);
-                 if (File.Exists(path))
-                 {
-                     return $"/static/audio/{edgeEntry.filename}";
-                 }
+                 return edgeUrl;
              }
 
-             try
-             {
-                 string filename = $"quote_Edge_{edgeVoiceId}_{GetMd5Hash(text).Substring(0, 12)}.mp3";
-                 string filePath = Path.Combine(_audioDir, filename);
-
-                var communicate = new Communicate(text, edgeVoiceId);
-                await communicate.Save(filePath);
-
-                 var newEntry = new AudioIndexEntry
-                 {
-                     text = text,
-                     voice = edgeVoiceId,
-                     engine = "edge-neural",
-                     format = "mp3",
-                     region = "global",
-                     filename = filename,
-                     created_ts = DateTime.UtcNow.ToString("yyyy-MM-ddTHH:mm:ssZ"),
-                     play_count = 1
-                 };
-                 _index[edgeKeyHash] = newEntry;
-                 SaveIndex();
-
-                 return $"/static/audio/{filename}";
-             }
-             catch (Exception)
-             {
-                 // Fallback to System TTS if Edge fails (e.g. 403 Forbidden)
-                 return await GenerateSystemAudioAsync(text);
-             }
+             return await EnqueueSynthesis(edgeKeyHash, ct => SynthesizeEdgeAudioAsync(text, edgeVoiceId, edgeKeyHash, ct));
         }
 
         var regionStr = _env.Get("AWS_REGION", "us-east-1");
@@ -122,38 +160,177 @@ public class TtsService
         var voiceId = _env.Get("POLLY_VOICE_ID", "Joanna");
         var format = "mp3";
         
-        // Default to neural, fallback to standard
-        string engine = "neural";
+        // Neural unless the voice is known to be standard-only; unknown voices still fall back on failure.
+        string engine = PickPollyEngine(regionStr, voiceId);
 
         // key_material = f"{text}|voice={vid}|engine={engine}|fmt={POLLY_OUTPUT_FORMAT}|region={AWS_REGION}"
-        string keyMaterial = $"{text}|voice={voiceId}|engine={engine}|fmt={format}|region={regionStr}";
-        string keyHash = GetMd5Hash(keyMaterial).Substring(0, 12);
+        string keyHash = GetAudioKey(text, PollyKeySuffix(voiceId, engine, format, regionStr));
+
+        if (TryGetCachedUrl(keyHash, out var url))
+        {
+            return url;
+        }
+
+        // Not in index, synthesize
+        return await EnqueueSynthesis(keyHash, ct => SynthesizePollyAudioAsync(text, voiceId, regionStr, accessKey, secretKey, format, engine, keyHash, ct));
+    }
+
+    // A hit also bumps the entry's play_count; the index is written by the debounced save.
+    private bool TryGetCachedUrl(string keyHash, out string url)
+    {
+        AudioIndexEntry? entry;
+        bool verified;
+        lock (_indexLock)
+        {
+            _index.TryGetValue(keyHash, out entry);
+            verified = _verifiedKeys.Contains(keyHash);
+        }
 
-        if (_index.TryGetValue(keyHash, out var entry))
+        if (entry != null)
         {
-            var path = Path.Combine(_audioDir, entry.filename);
-            if (File.Exists(path))
+            // Only stat the file the first time a key is served; repeats skip the disk.
+            if (verified || File.Exists(Path.Combine(_audioDir, entry.filename)))
             {
-                // Increment play count? Python does it? Maybe. Not critical.
-                return $"/static/audio/{entry.filename}";
+                lock (_indexLock)
+                {
+                    _verifiedKeys.Add(keyHash);
+                    entry.play_count++;
+                }
+                ScheduleIndexSave();
+                url = $"/static/audio/{entry.filename}";
+                return true;
             }
         }
 
-        // Not in index, synthesize
-        try
+        url = "";
+        return false;
+    }
+
+    // Deletes generated clips and returns how many were removed. The index is kept;
+    // entries whose file is gone are re-synthesized on next use.
+    public int ClearCache()
+    {
+        int count = 0;
+        // Streams the directory listing rather than materializing every path up front.
+        foreach (var file in Directory.EnumerateFiles(_audioDir, "quote_*.*"))
         {
-            var region = RegionEndpoint.GetBySystemName(regionStr);
-            AmazonPollyClient client;
-            
-            if (!string.IsNullOrEmpty(accessKey) && !string.IsNullOrEmpty(secretKey))
+            try
             {
-                client = new AmazonPollyClient(accessKey, secretKey, region);
+                File.Delete(file);
+                count++;
             }
-            else
+            catch { /* ignore locked files */ }
+        }
+
+        lock (_indexLock)
+        {
+            _verifiedKeys.Clear();
+        }
+        return count;
+    }
+
+    // Cache misses are handed to a single background worker so synthesis never runs
+    // on the caller's thread and only one engine session is active at a time.
+    // Requests for a key that is already queued share that job instead of synthesizing twice.
+    private Task<string> EnqueueSynthesis(string keyHash, Func<CancellationToken, Task<string>> work)
+    {
+        lock (_inFlight)
+        {
+            if (_inFlight.TryGetValue(keyHash, out var pending))
             {
-                client = new AmazonPollyClient(region);
+                return pending;
             }
 
+            var job = new SynthesisJob(keyHash, work);
+            if (!_synthesisQueue.Writer.TryWrite(job))
+            {
+                return Task.FromException<string>(new InvalidOperationException("TTS worker is not running."));
+            }
+            _inFlight[keyHash] = job.Completion.Task;
+            return job.Completion.Task;
+        }
+    }
+
+    private async Task ProcessSynthesisQueueAsync()
+    {
+        await foreach (var job in _synthesisQueue.Reader.ReadAllAsync())
+        {
+            using var timeout = new CancellationTokenSource();
+            Task<string>? work = null;
+            try
+            {
+                work = job.Work(timeout.Token);
+                job.Completion.TrySetResult(await work.WaitAsync(SynthesisTimeout));
+            }
+            catch (TimeoutException ex) when (work != null)
+            {
+                job.Completion.TrySetException(ex);
+                timeout.Cancel();
+                // Polly and System stop at the cancelled token; an Edge save runs until its socket gives up.
+                try { await work; } catch { }
+            }
+            catch (Exception ex)
+            {
+                job.Completion.TrySetException(ex);
+            }
+            finally
+            {
+                lock (_inFlight)
+                {
+                    _inFlight.Remove(job.KeyHash);
+                }
+            }
+        }
+    }
+
+    private async Task<string> SynthesizeEdgeAudioAsync(string text, string edgeVoiceId, string edgeKeyHash, CancellationToken ct)
+    {
+        try
+        {
+            string filename = $"quote_Edge_{edgeVoiceId}_{GetTextHash(text)}.mp3";
+            string filePath = Path.Combine(_audioDir, filename);
+
+            var communicate = new Communicate(text, edgeVoiceId);
+            var tempPath = GetTempPath(filePath);
+            await communicate.Save(tempPath);
+            CommitTempFile(tempPath, filePath);
+
+            var newEntry = new AudioIndexEntry
+            {
+                text = text,
+                voice = edgeVoiceId,
+                engine = "edge-neural",
+                format = "mp3",
+                region = "global",
+                filename = filename,
+                created_ts = Timestamps.UtcNowIso(),
+                play_count = 1
+            };
+            AddIndexEntry(edgeKeyHash, newEntry);
+
+            return $"/static/audio/{filename}";
+        }
+        catch (Exception) when (!ct.IsCancellationRequested)
+        {
+            // Fallback to System TTS if Edge fails (e.g. 403 Forbidden).
+            // Already on the worker, so synthesize directly rather than re-queueing.
+            var sysKeyHash = GetSystemKeyHash(text, out var sysVoiceId);
+            if (TryGetCachedUrl(sysKeyHash, out var sysUrl))
+            {
+                return sysUrl;
+            }
+            return await SynthesizeSystemAudioAsync(text, sysVoiceId, sysKeyHash, ct);
+        }
+    }
+
+    private async Task<string> SynthesizePollyAudioAsync(string text, string voiceId, string regionStr, string accessKey, string secretKey, string format, string engine, string keyHash, CancellationToken ct)
+    {
+        string requestedEngine = engine;
+
+        try
+        {
+            var client = GetPollyClient(regionStr, accessKey, secretKey);
+
             var request = new SynthesizeSpeechRequest
             {
                 Text = text,
@@ -165,14 +342,20 @@ public class TtsService
             SynthesizeSpeechResponse response;
             try 
             {
-                response = await client.SynthesizeSpeechAsync(request);
+                response = await client.SynthesizeSpeechAsync(request, ct);
             }
-            catch (Exception)
+            catch (Exception ex) when (engine == "neural" && !ct.IsCancellationRequested)
             {
-                // Retry with standard
+                // Retry with standard. Only remember it (so later lookups use the standard key directly)
+                // when Polly said the voice has no neural engine; throttling or a network blip says nothing
+                // about the voice, and without a loaded catalog nothing else would correct it.
                 request.Engine = Engine.Standard;
                 engine = "standard";
-                response = await client.SynthesizeSpeechAsync(request);
+                response = await client.SynthesizeSpeechAsync(request, ct);
+                if (ex is EngineNotSupportedException)
+                {
+                    RecordPollyEngines(regionStr, voiceId, PollyEngines.Standard);
+                }
             }
 
             // Recalculate key hash if engine changed?
@@ -197,22 +380,24 @@ public class TtsService
             // I'll assume I should use the FINAL engine for the key to be correct for future lookups of that engine.
             
             // Let's recompute keyHash if engine changed
-            if (engine != "neural") // assuming we started with neural
+            if (engine != requestedEngine)
             {
-                 keyMaterial = $"{text}|voice={voiceId}|engine={engine}|fmt={format}|region={regionStr}";
-                 keyHash = GetMd5Hash(keyMaterial).Substring(0, 12);
+                 keyHash = GetAudioKey(text, PollyKeySuffix(voiceId, engine, format, regionStr));
             }
 
             // Save file
-            string textHash = GetMd5Hash(text).Substring(0, 12);
+            string textHash = GetTextHash(text);
             string safeVoice = voiceId; 
             string filename = $"quote_{safeVoice}_{engine}_{textHash}.{format}";
             string filePath = Path.Combine(_audioDir, filename);
 
-            using (var fileStream = File.Create(filePath))
+            // Stream straight to disk in 64 KiB chunks
+            var tempPath = GetTempPath(filePath);
+            using (var fileStream = File.Create(tempPath))
             {
-                await response.AudioStream.CopyToAsync(fileStream);
+                await response.AudioStream.CopyToAsync(fileStream, AudioCopyBufferSize, ct);
             }
+            CommitTempFile(tempPath, filePath);
 
             // Update index
             var newEntry = new AudioIndexEntry
@@ -223,11 +408,10 @@ public class TtsService
                 format = format,
                 region = regionStr,
                 filename = filename,
-                created_ts = DateTime.UtcNow.ToString("yyyy-MM-ddTHH:mm:ssZ"),
+                created_ts = Timestamps.UtcNowIso(),
                 play_count = 1
             };
-            _index[keyHash] = newEntry;
-            SaveIndex();
+            AddIndexEntry(keyHash, newEntry);
 
             return $"/static/audio/{filename}";
         }
@@ -237,27 +421,200 @@ public class TtsService
         }
     }
 
-    private async Task<string> GenerateSystemAudioAsync(string text)
+    // Shared by the synthesis worker and the settings window's voice list.
+    private AmazonPollyClient GetPollyClient(string regionStr, string accessKey, string secretKey)
     {
-        var sysVoiceId = _env.Get("POLLY_VOICE_ID"); // For System provider, this holds the voice name
-        
-        string sysKeyMaterial = $"{text}|voice={sysVoiceId}|provider=System";
-        string sysKeyHash = GetMd5Hash(sysKeyMaterial).Substring(0, 12);
+        var clientKey = $"{regionStr}|{accessKey}|{secretKey}";
+        lock (_pollyLock)
+        {
+            if (_pollyClient != null && _pollyClientKey == clientKey)
+            {
+                return _pollyClient;
+            }
+
+            var region = RegionEndpoint.GetBySystemName(regionStr);
+            var client = !string.IsNullOrEmpty(accessKey) && !string.IsNullOrEmpty(secretKey)
+                ? new AmazonPollyClient(accessKey, secretKey, region)
+                : new AmazonPollyClient(region);
+
+            // The previous client isn't disposed here: a synthesis may still be using it.
+            _pollyClient = client;
+            _pollyClientKey = clientKey;
+            return client;
+        }
+    }
+
+    // Voice catalog per region, refreshed after VoiceCatalogTtl so new voices eventually appear.
+    public async Task<List<Voice>> GetPollyVoicesAsync(string regionStr, string accessKey, string secretKey, bool refresh = false)
+    {
+        if (!refresh)
+        {
+            lock (_pollyLock)
+            {
+                if (_pollyVoiceCache != null
+                    && _pollyVoiceCache.TryGetValue(regionStr, out var cached)
+                    && Environment.TickCount64 - cached.FetchedAt < (long)VoiceCatalogTtl.TotalMilliseconds)
+                {
+                    return cached.Voices;
+                }
+            }
+
+            var saved = LoadVoiceCatalog(regionStr);
+            if (saved != null)
+            {
+                CachePollyVoices(regionStr, saved);
+                return saved;
+            }
+        }
+
+        var client = GetPollyClient(regionStr, accessKey, secretKey);
+        // The SDK paginator follows NextToken for us across however many pages the region returns.
+        var voices = new List<Voice>();
+        await foreach (var voice in client.Paginators.DescribeVoices(new DescribeVoicesRequest()).Voices)
+        {
+            voices.Add(voice);
+        }
+
+        if (voices.Count > 0)
+        {
+            CachePollyVoices(regionStr, voices);
+            SaveVoiceCatalog(regionStr, voices);
+        }
+        return voices;
+    }
+
+    private void CachePollyVoices(string regionStr, List<Voice> voices)
+    {
+        lock (_pollyLock)
+        {
+            _pollyVoiceCache ??= new();
+            _pollyVoiceCache[regionStr] = (voices, Environment.TickCount64);
+            foreach (var voice in voices)
+            {
+                _pollyVoiceEngines[(regionStr, voice.Id.Value)] = ParseEngines(voice.SupportedEngines);
+            }
+        }
+    }
+
+    private string GetVoiceCatalogPath(string regionStr) => Path.Combine(_audioDir, $"polly_voices_{regionStr}.json");
 
-        if (_index.TryGetValue(sysKeyHash, out var sysEntry))
+    private List<Voice>? LoadVoiceCatalog(string regionStr)
+    {
+        try
         {
-            var path = Path.Combine(_audioDir, sysEntry.filename);
-            if (File.Exists(path))
+            var path = GetVoiceCatalogPath(regionStr);
+            if (!File.Exists(path) || DateTime.UtcNow - File.GetLastWriteTimeUtc(path) > VoiceCatalogDiskTtl) return null;
+
+            var entries = JsonSerializer.Deserialize<List<VoiceCatalogEntry>>(File.ReadAllBytes(path));
+            if (entries == null || entries.Count == 0) return null;
+
+            var voices = new List<Voice>(entries.Count);
+            foreach (var e in entries)
             {
-                return $"/static/audio/{sysEntry.filename}";
+                voices.Add(new Voice
+                {
+                    Id = VoiceId.FindValue(e.id),
+                    Name = e.name,
+                    Gender = Gender.FindValue(e.gender),
+                    LanguageCode = LanguageCode.FindValue(e.language),
+                    SupportedEngines = e.engines
+                });
             }
+            return voices;
+        }
+        catch
+        {
+            return null; // Unreadable catalog; fetch a fresh one
         }
+    }
 
+    private void SaveVoiceCatalog(string regionStr, List<Voice> voices)
+    {
         try
         {
-            string filename = $"quote_System_{sysVoiceId ?? "Default"}_{GetMd5Hash(text).Substring(0, 12)}.wav";
+            var entries = new List<VoiceCatalogEntry>(voices.Count);
+            foreach (var v in voices)
+            {
+                entries.Add(new VoiceCatalogEntry
+                {
+                    id = v.Id?.Value ?? "",
+                    name = v.Name ?? "",
+                    gender = v.Gender?.Value ?? "",
+                    language = v.LanguageCode?.Value ?? "",
+                    engines = v.SupportedEngines ?? new List<string>()
+                });
+            }
+
+            var path = GetVoiceCatalogPath(regionStr);
+            var tempPath = GetTempPath(path);
+            File.WriteAllBytes(tempPath, JsonSerializer.SerializeToUtf8Bytes(entries));
+            CommitTempFile(tempPath, path);
+        }
+        catch { /* Best effort; the in-memory catalog still serves this session */ }
+    }
+
+    private string PickPollyEngine(string regionStr, string voiceId)
+    {
+        lock (_pollyLock)
+        {
+            if (_pollyVoiceEngines.TryGetValue((regionStr, voiceId), out var engines)
+                && (engines & PollyEngines.Neural) == 0
+                && (engines & PollyEngines.Standard) != 0)
+            {
+                return "standard";
+            }
+        }
+        return "neural";
+    }
+
+    // Learned engines only fill gaps; the catalog stays authoritative over a transient neural failure.
+    private void RecordPollyEngines(string regionStr, string voiceId, PollyEngines engines)
+    {
+        lock (_pollyLock)
+        {
+            _pollyVoiceEngines.TryAdd((regionStr, voiceId), engines);
+        }
+    }
+
+    private static PollyEngines ParseEngines(List<string>? supportedEngines)
+    {
+        var engines = PollyEngines.None;
+        if (supportedEngines == null) return engines;
+        foreach (var name in supportedEngines)
+        {
+            if (name == "standard") engines |= PollyEngines.Standard;
+            else if (name == "neural") engines |= PollyEngines.Neural;
+        }
+        return engines;
+    }
+
+    private async Task<string> GenerateSystemAudioAsync(string text)
+    {
+        var sysKeyHash = GetSystemKeyHash(text, out var sysVoiceId);
+
+        if (TryGetCachedUrl(sysKeyHash, out var sysUrl))
+        {
+            return sysUrl;
+        }
+
+        return await EnqueueSynthesis(sysKeyHash, ct => SynthesizeSystemAudioAsync(text, sysVoiceId, sysKeyHash, ct));
+    }
+
+    private string GetSystemKeyHash(string text, out string? sysVoiceId)
+    {
+        sysVoiceId = _env.Get("POLLY_VOICE_ID"); // For System provider, this holds the voice name
+        
+        return GetAudioKey(text, SystemKeySuffix(sysVoiceId));
+    }
+
+    private async Task<string> SynthesizeSystemAudioAsync(string text, string? sysVoiceId, string sysKeyHash, CancellationToken ct)
+    {
+        try
+        {
+            string filename = $"quote_System_{sysVoiceId ?? "Default"}_{GetTextHash(text)}.wav";
             string filePath = Path.Combine(_audioDir, filename);
 
+            var tempPath = GetTempPath(filePath);
             await Task.Run(() => 
             {
                 using var synth = new SpeechSynthesizer();
@@ -265,9 +622,11 @@ public class TtsService
                 {
                     try { synth.SelectVoice(sysVoiceId); } catch { /* Fallback to default */ }
                 }
-                synth.SetOutputToWaveFile(filePath);
+                synth.SetOutputToWaveFile(tempPath);
                 synth.Speak(text);
-            });
+            }, ct);
+            ct.ThrowIfCancellationRequested();
+            CommitTempFile(tempPath, filePath);
 
             var newEntry = new AudioIndexEntry
             {
@@ -277,11 +636,10 @@ public class TtsService
                 format = "wav",
                 region = "local",
                 filename = filename,
-                created_ts = DateTime.UtcNow.ToString("yyyy-MM-ddTHH:mm:ssZ"),
+                created_ts = Timestamps.UtcNowIso(),
                 play_count = 1
             };
-            _index[sysKeyHash] = newEntry;
-            SaveIndex();
+            AddIndexEntry(sysKeyHash, newEntry);
 
             return $"/static/audio/{filename}";
         }
@@ -291,12 +649,101 @@ public class TtsService
         }
     }
 
-    private string GetMd5Hash(string input)
+    // Clips are written under a temporary name and moved into place once complete, so a crash
+    // or failed synthesis never leaves a truncated file where the cache expects a playable one.
+    private static string GetTempPath(string filePath) => filePath + ".tmp";
+
+    private static void CommitTempFile(string tempPath, string filePath) => File.Move(tempPath, filePath, overwrite: true);
+
+    // Index keys are the hash of the quote text followed by a per-provider suffix describing
+    // the voice settings. Keep these in one place so lookups and saves can't drift apart.
+    private static string EdgeKeySuffix(string voiceId) => $"|voice={voiceId}|provider=Edge";
+
+    private static string PollyKeySuffix(string voiceId, string engine, string format, string regionStr)
+        => $"|voice={voiceId}|engine={engine}|fmt={format}|region={regionStr}";
+
+    private static string SystemKeySuffix(string? voiceId) => $"|voice={voiceId}|provider=System";
+
+    private static string GetAudioKey(string text, string keySuffix) => GetShortHash(NormalizeForCache(text), keySuffix);
+
+    private static string GetTextHash(string text) => GetShortHash(NormalizeForCache(text));
+
+    // Hash input only: collapses whitespace runs (including NBSP/tabs) and applies NFC, so
+    // trivially different copies of a quote share one clip. The original text is still
+    // what gets spoken. Already-clean text, the usual case, is returned without allocating.
+    private static string NormalizeForCache(string text)
+    {
+        bool needsCollapse = text.Length > 0 && (text[0] == ' ' || text[^1] == ' ');
+        for (int i = 0; i < text.Length && !needsCollapse; i++)
+        {
+            char c = text[i];
+            if (char.IsWhiteSpace(c) && (c != ' ' || (i > 0 && text[i - 1] == ' ')))
+            {
+                needsCollapse = true;
+            }
+        }
+
+        if (needsCollapse)
+        {
+            text = string.Join(' ', text.Split((char[]?)null, StringSplitOptions.RemoveEmptyEntries));
+        }
+        return text.IsNormalized() ? text : text.Normalize();
+    }
+
+    // First 12 hex chars of MD5. MD5 is kept (rather than a newer hash) so existing
+    // audio_cache file names and index keys stay valid. Hashes input + suffix as if
+    // concatenated; quotes are short, so the UTF-8 bytes normally fit on the stack.
+    private static string GetShortHash(string input, string suffix = "")
+    {
+        const int StackLimit = 1024;
+        int maxBytes = Encoding.UTF8.GetMaxByteCount(input.Length + suffix.Length);
+        byte[]? rented = null;
+        Span<byte> buffer = maxBytes <= StackLimit
+            ? stackalloc byte[StackLimit]
+            : (rented = ArrayPool<byte>.Shared.Rent(maxBytes));
+        try
+        {
+            int length = Encoding.UTF8.GetBytes(input, buffer);
+            length += Encoding.UTF8.GetBytes(suffix, buffer[length..]);
+
+            Span<byte> hash = stackalloc byte[MD5.HashSizeInBytes];
+            MD5.HashData(buffer[..length], hash);
+            return Convert.ToHexStringLower(hash[..6]);
+        }
+        finally
+        {
+            if (rented != null) ArrayPool<byte>.Shared.Return(rented);
+        }
+    }
+
+    [Flags]
+    private enum PollyEngines
+    {
+        None = 0,
+        Standard = 1,
+        Neural = 2
+    }
+
+    private sealed class SynthesisJob
+    {
+        public SynthesisJob(string keyHash, Func<CancellationToken, Task<string>> work)
+        {
+            KeyHash = keyHash;
+            Work = work;
+        }
+
+        public string KeyHash { get; }
+        public Func<CancellationToken, Task<string>> Work { get; }
+        public TaskCompletionSource<string> Completion { get; } = new(TaskCreationOptions.RunContinuationsAsynchronously);
+    }
+
+    public class VoiceCatalogEntry
     {
-        using var md5 = MD5.Create();
-        var bytes = Encoding.UTF8.GetBytes(input);
-        var hash = md5.ComputeHash(bytes);
-        return BitConverter.ToString(hash).Replace("-", "").ToLowerInvariant();
+        public string id { get; set; } = "";
+        public string name { get; set; } = "";
+        public string gender { get; set; } = "";
+        public string language { get; set; } = "";
+        public List<string> engines { get; set; } = new();
     }
 
     public class AudioIndexEntry
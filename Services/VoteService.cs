@@ -1,15 +1,192 @@
-using System.Threading.Channels;
+using System.Buffers;
+using System.Text.Json;
+using System.Text.Json.Serialization.Metadata;
 
 namespace LandingJudge.Services;
 
 public class VoteService
 {
-    // Event to notify active streams: (eventType, jsonData)
-    public event Action<string, string>? OnEvent;
+    private static ReadOnlySpan<byte> SseDataPrefix => "data: "u8;
+    private static ReadOnlySpan<byte> SseFrameEnd => "\n\n"u8;
+
+    // Source-generated serializers for the known payload records; anything else falls back to reflection.
+    private static readonly JsonSerializerOptions SseJsonOptions = new()
+    {
+        TypeInfoResolver = JsonTypeInfoResolver.Combine(SseJsonContext.Default, new DefaultJsonTypeInfoResolver())
+    };
+
+    // SSE comment line; EventSource ignores it, but it keeps idle proxies and OBS from dropping the stream.
+    public static readonly byte[] KeepAliveFrame = ": keep-alive\n\n"u8.ToArray();
+    public static readonly TimeSpan KeepAliveInterval = TimeSpan.FromSeconds(15);
+
+    // Recent SSE frames shared by every /stream client. Each client remembers the last
+    // sequence it wrote and reads forward; one that falls more than RingSize events
+    // behind skips ahead instead of buffering.
+    private const int RingSize = 256;
+
+    private readonly byte[][] _ring = new byte[RingSize][];
+    private readonly object _writeLock = new();
+    private long _sequence;
+    private long _voteIds;
+    private long _droppedFrames;
+    private long _lastDropLogTicks;
+    private TaskCompletionSource _published = new(TaskCreationOptions.RunContinuationsAsynchronously);
+
+    // Raised (on a pool thread) when a vote's audio fails to synthesize; the banner still shows without it.
+    public event Action<Exception>? OnTtsError;
+
+    public long Sequence => Volatile.Read(ref _sequence);
+
+    // Frames skipped by streams that fell more than RingSize events behind.
+    public long DroppedFrames => Interlocked.Read(ref _droppedFrames);
 
     public void Broadcast(string eventType, object data)
     {
-        var json = System.Text.Json.JsonSerializer.Serialize(data);
-        OnEvent?.Invoke(eventType, json);
+        // Encoded once here; every stream writes the same frame bytes as-is.
+        var frame = FormatSseFrame(data);
+
+        TaskCompletionSource published;
+        lock (_writeLock)
+        {
+            var next = _sequence + 1;
+            _ring[next % RingSize] = frame;
+            Volatile.Write(ref _sequence, next);
+            published = _published;
+            Volatile.Write(ref _published, new TaskCompletionSource(TaskCreationOptions.RunContinuationsAsynchronously));
+        }
+        // One wake-up for all waiting streams, regardless of how many are connected.
+        published.TrySetResult();
+    }
+
+    // Ids let the overlay match a late audio_ready event to the vote it belongs to.
+    public long NextVoteId() => Interlocked.Increment(ref _voteIds);
+
+    // Follows up a vote that was broadcast before its clip finished synthesizing.
+    public async Task BroadcastAudioWhenReadyAsync(long voteId, Task<string> audioTask)
+    {
+        try
+        {
+            var audioUrl = await audioTask;
+            if (!string.IsNullOrEmpty(audioUrl))
+            {
+                Broadcast("audio_ready", new AudioReadyPayload { vote_id = voteId, audio_url = audioUrl });
+            }
+        }
+        catch (Exception ex)
+        {
+            // The overlay times the banner out without audio
+            OnTtsError?.Invoke(ex);
+        }
+    }
+
+    // Shared by the /vote endpoint and the control panel buttons: picks the quote, starts TTS,
+    // broadcasts the vote and returns what was sent.
+    public async Task<VotePayload> CastVoteAsync(int score, QuoteService quotes, TtsService? tts, EnvService env)
+    {
+        env.ReloadIfChanged(); // Pick up manual .env edits; UI changes are already in memory.
+
+        score = Math.Clamp(score, 1, 10);
+        var (quote, message) = quotes.GetQuote(score);
+        var tier = quotes.GetTier(score);
+
+        var enableTts = env.GetBool("ENABLE_TTS", true);
+        var enableBell = env.GetBool("ENABLE_DINGDONG", true);
+        // Cache hits complete synchronously. A miss is broadcast right away without audio
+        // and followed by an audio_ready event once synthesis finishes.
+        var audioTask = enableTts && tts != null ? tts.GenerateAudioUrlAsync(quote) : Task.FromResult("");
+        var audioPending = !audioTask.IsCompleted;
+        var audioUrl = "";
+        if (!audioPending)
+        {
+            try { audioUrl = await audioTask; }
+            catch (Exception ex) { OnTtsError?.Invoke(ex); }
+        }
+        var voteId = NextVoteId();
+
+        var payload = new VotePayload
+        {
+            score = score,
+            level = tier,
+            quote = quote,
+            message = message,
+            audio_url = audioUrl,
+            audio_pending = audioPending,
+            vote_id = voteId,
+            duration_ms = env.GetInt("BANNER_DURATION_MS", 8000),
+            enable_tts = enableTts,
+            enable_dingdong = enableBell,
+            effects = EffectsPayload.FromEnv(env),
+            ts = Timestamps.UtcNowIso()
+        };
+
+        Broadcast("vote", payload);
+        if (audioPending)
+        {
+            _ = BroadcastAudioWhenReadyAsync(voteId, audioTask);
+        }
+        return payload;
+    }
+
+    // Serializes a payload directly into a complete "data: {json}\n\n" SSE frame.
+    public static byte[] FormatSseFrame(object data)
+    {
+        var buffer = new ArrayBufferWriter<byte>(256);
+        buffer.Write(SseDataPrefix);
+        using (var writer = new Utf8JsonWriter(buffer))
+        {
+            JsonSerializer.Serialize(writer, data, data.GetType(), SseJsonOptions);
+        }
+        buffer.Write(SseFrameEnd);
+        return buffer.WrittenSpan.ToArray();
+    }
+
+    // Completes once an event newer than `after` is published. The task is shared by every
+    // waiting stream and attaches nothing per caller, so it can be awaited repeatedly (with a
+    // timeout) across keep-alives without leaving anything behind.
+    public Task WaitForEventAsync(long after)
+    {
+        // Grab the signal before checking the sequence so a concurrent Broadcast can't be missed.
+        var published = Volatile.Read(ref _published);
+        return Sequence > after ? Task.CompletedTask : published.Task;
+    }
+
+    // Appends every frame newer than `after` to `into` and returns the new last-seen sequence.
+    public long ReadSince(long after, List<byte[]> into)
+    {
+        var latest = Sequence;
+        var first = Math.Max(after + 1, latest - RingSize + 1);
+        var start = into.Count;
+        for (var seq = first; seq <= latest; seq++)
+        {
+            into.Add(Volatile.Read(ref _ring[seq % RingSize]));
+        }
+
+        // Broadcasts may have lapped the oldest slots while they were copied. A slot is filled before
+        // its sequence is published, so with the next write possibly in flight only slots newer than
+        // Sequence + 1 - RingSize are certain to still hold their own frame; the rest count as dropped.
+        var intactFrom = Sequence + 2 - RingSize;
+        if (intactFrom > first)
+        {
+            var lapped = (int)Math.Min(intactFrom - first, latest - first + 1);
+            into.RemoveRange(start, lapped);
+            first += lapped;
+        }
+
+        if (first > after + 1)
+        {
+            RecordDropped(first - after - 1);
+        }
+        return latest;
+    }
+
+    private void RecordDropped(long count)
+    {
+        var total = Interlocked.Add(ref _droppedFrames, count);
+
+        // At most one log line a minute, however many slow clients there are.
+        var now = Environment.TickCount64;
+        var last = Interlocked.Read(ref _lastDropLogTicks);
+        if (now - last < 60_000 || Interlocked.CompareExchange(ref _lastDropLogTicks, now, last) != last) return;
+        try { File.AppendAllText("debug.log", $"[{DateTime.Now}] SSE client fell behind; {count} events skipped ({total} total).\n"); } catch { }
     }
 }
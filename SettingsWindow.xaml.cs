@@ -18,17 +18,70 @@ namespace LandingJudge;
 public partial class SettingsWindow : Window
 {
     private readonly EnvService? _env;
+    private readonly TtsService? _ttsService;
+    private bool _rendered;
 
-    public SettingsWindow(EnvService? env)
+    // Fallback voice lists for when the provider can't be queried.
+    private static readonly string[] CommonEdgeVoices =
+    {
+        "en-US-AriaNeural", "en-US-GuyNeural", "en-US-JennyNeural", "en-US-EricNeural",
+        "en-GB-SoniaNeural", "en-GB-RyanNeural", "en-GB-LibbyNeural",
+        "en-AU-NatashaNeural", "en-AU-WilliamNeural",
+        "fr-FR-DeniseNeural", "fr-FR-HenriNeural",
+        "de-DE-KatjaNeural", "de-DE-ConradNeural",
+        "es-ES-ElviraNeural", "es-ES-AlvaroNeural",
+        "it-IT-ElsaNeural", "it-IT-IsabellaNeural",
+        "ja-JP-NanamiNeural", "ja-JP-KeitaNeural",
+        "ko-KR-SunHiNeural", "ko-KR-InJoonNeural",
+        "zh-CN-XiaoxiaoNeural", "zh-CN-YunxiNeural"
+    };
+
+    // System and Edge voice lists from earlier loads this session; Polly's catalog is cached by TtsService.
+    // Refresh re-queries the provider.
+    private static readonly Dictionary<string, VoiceViewModel[]> ProviderVoiceCache = new();
+
+    private static readonly string[] CommonPollyVoices = { "Joanna", "Matthew", "Ivy", "Justin", "Kendra", "Joey", "Salli", "Kimberly" };
+
+    public SettingsWindow(EnvService? env, TtsService? ttsService)
     {
         InitializeComponent();
         _env = env;
+        _ttsService = ttsService;
         LoadSettings();
+        ContentRendered += SettingsWindow_ContentRendered;
+    }
+
+    // Voice listing enumerates SAPI voices or calls Edge/Polly; start it once the dialog has painted.
+    private async void SettingsWindow_ContentRendered(object? sender, EventArgs e)
+    {
+        ContentRendered -= SettingsWindow_ContentRendered;
+        _rendered = true;
+
+        // Polly's catalog is a network round trip; show the saved voice and only fetch
+        // the full list if the user actually opens the voice dropdown.
+        var provider = (ProviderCombo.SelectedItem as ComboBoxItem)?.Tag?.ToString();
+        if (provider == "AWS")
+        {
+            var saved = _env?.Get("POLLY_VOICE_ID", "Joanna") ?? "Joanna";
+            var placeholder = new VoiceViewModel { Name = saved, Id = saved, Flag = GetFlag(""), Locale = "" };
+            VoiceCombo.ItemsSource = new[] { placeholder };
+            VoiceCombo.SelectedItem = placeholder;
+            VoiceCombo.DropDownOpened += VoiceCombo_DropDownOpened;
+            return;
+        }
+
+        await LoadVoicesForProviderAsync();
+    }
+
+    private async void VoiceCombo_DropDownOpened(object? sender, EventArgs e)
+    {
+        await LoadVoicesForProviderAsync();
     }
 
     private async void ProviderCombo_SelectionChanged(object sender, SelectionChangedEventArgs e)
     {
         UpdateVisibility();
+        if (!_rendered) return; // Initial provider selection from LoadSettings
         await LoadVoicesForProviderAsync();
     }
 
@@ -41,7 +94,7 @@ public partial class SettingsWindow : Window
 
     private void LoadSettings()
     {
-        _env?.Load();
+        _env?.ReloadIfChanged(); // Only re-read .env if it was edited outside the app
 
         PortBox.Text = _env?.Get("PORT", "5000") ?? "5000";
 
@@ -52,7 +105,6 @@ public partial class SettingsWindow : Window
             ?? ProviderCombo.Items.OfType<ComboBoxItem>().First();
 
         UpdateVisibility();
-        _ = LoadVoicesForProviderAsync();
 
         var region = _env?.Get("AWS_REGION", "us-east-1") ?? "us-east-1";
         RegionCombo.SelectedItem = RegionCombo.Items
@@ -79,10 +131,6 @@ public partial class SettingsWindow : Window
             return;
         }
 
-        if (int.TryParse(PortBox.Text, out var parsedPort) && parsedPort > 0 && parsedPort < 65536)
-        {
-            _env.Set("PORT", parsedPort.ToString());
-        }
 
         var provider = (ProviderCombo.SelectedItem as ComboBoxItem)?.Tag?.ToString() ?? "Edge";
         var region = (RegionCombo.SelectedItem as ComboBoxItem)?.Content?.ToString() ?? "us-east-1";
@@ -100,13 +148,21 @@ public partial class SettingsWindow : Window
              voiceId = !string.IsNullOrEmpty(saved) ? saved : "Joanna";
         }
 
-        _env.Set("TTS_PROVIDER", provider);
-        _env.Set("ENABLE_TTS", TtsCheck.IsChecked == true ? "true" : "false");
-        _env.Set("AWS_REGION", region);
-        _env.Set("POLLY_VOICE_ID", voiceId);
-        _env.Set("POLLY_OUTPUT_FORMAT", "mp3");
-        _env.Set("AWS_ACCESS_KEY_ID", KeyBox.Text?.Trim() ?? "");
-        _env.Set("AWS_SECRET_ACCESS_KEY", SecretBox.Password?.Trim() ?? "");
+        var values = new List<(string Key, string Value)>
+        {
+            ("TTS_PROVIDER", provider),
+            ("ENABLE_TTS", TtsCheck.IsChecked == true ? "true" : "false"),
+            ("AWS_REGION", region),
+            ("POLLY_VOICE_ID", voiceId),
+            ("POLLY_OUTPUT_FORMAT", "mp3"),
+            ("AWS_ACCESS_KEY_ID", KeyBox.Text?.Trim() ?? ""),
+            ("AWS_SECRET_ACCESS_KEY", SecretBox.Password?.Trim() ?? "")
+        };
+        if (int.TryParse(PortBox.Text, out var parsedPort) && parsedPort > 0 && parsedPort < 65536)
+        {
+            values.Add(("PORT", parsedPort.ToString()));
+        }
+        _env.SetMany(values.ToArray());
 
         DialogResult = true;
         Close();
@@ -119,7 +175,7 @@ public partial class SettingsWindow : Window
 
     private void LoadVoices_Click(object sender, RoutedEventArgs e)
     {
-        _ = LoadVoicesForProviderAsync();
+        _ = LoadVoicesForProviderAsync(refresh: true);
     }
 
     private int GetLocalePriority(string locale)
@@ -131,21 +187,32 @@ public partial class SettingsWindow : Window
         return 10;
     }
 
-    private async Task LoadVoicesForProviderAsync()
+    private async Task LoadVoicesForProviderAsync(bool refresh = false)
     {
         var provider = (ProviderCombo.SelectedItem as ComboBoxItem)?.Tag?.ToString() ?? "AWS";
-        VoiceCombo.Items.Clear();
+        VoiceCombo.DropDownOpened -= VoiceCombo_DropDownOpened; // Any load replaces the deferred placeholder
+        VoiceCombo.ItemsSource = null;
         var voiceList = new List<VoiceViewModel>();
 
-        if (provider == "System")
+        if (!refresh && ProviderVoiceCache.TryGetValue(provider, out var cachedVoices))
         {
-            using var synth = new SpeechSynthesizer();
-            foreach (var v in synth.GetInstalledVoices())
+            voiceList.AddRange(cachedVoices);
+        }
+        else if (provider == "System")
+        {
+            // SAPI enumeration reads the registry and can stall; keep it off the UI thread.
+            var installed = await Task.Run(() =>
+            {
+                using var synth = new SpeechSynthesizer();
+                return synth.GetInstalledVoices()
+                    .Select(v => (Name: v.VoiceInfo.Name, Locale: v.VoiceInfo.Culture.Name))
+                    .ToList();
+            });
+            foreach (var (name, locale) in installed)
             {
-                var name = v.VoiceInfo.Name;
-                var locale = v.VoiceInfo.Culture.Name;
-                voiceList.Add(new VoiceViewModel { Name = name, Id = name, FlagPath = GetFlagPath(locale), Locale = locale });
+                voiceList.Add(new VoiceViewModel { Name = name, Id = name, Flag = GetFlag(locale), Locale = locale });
             }
+            ProviderVoiceCache[provider] = voiceList.ToArray();
         }
         else if (provider == "Edge")
         {
@@ -162,84 +229,41 @@ public partial class SettingsWindow : Window
                         { 
                             Name = $"{v.ShortName} ({v.Gender}){suffix}", 
                             Id = v.ShortName, 
-                            FlagPath = GetFlagPath(v.Locale),
+                            Flag = GetFlag(v.Locale),
                             Locale = v.Locale
                         });
                     }
+                    ProviderVoiceCache[provider] = voiceList.ToArray();
                 }
             }
             catch { /* Ignore and fall back to hardcoded */ }
 
             if (voiceList.Count == 0)
             {
-             try
-             {
-                var commonEdgeVoices = new[] 
-                {
-                    "en-US-AriaNeural", "en-US-GuyNeural", "en-US-JennyNeural", "en-US-EricNeural",
-                    "en-GB-SoniaNeural", "en-GB-RyanNeural", "en-GB-LibbyNeural",
-                    "en-AU-NatashaNeural", "en-AU-WilliamNeural",
-                    "fr-FR-DeniseNeural", "fr-FR-HenriNeural",
-                    "de-DE-KatjaNeural", "de-DE-ConradNeural",
-                    "es-ES-ElviraNeural", "es-ES-AlvaroNeural",
-                    "it-IT-ElsaNeural", "it-IT-IsabellaNeural",
-                    "ja-JP-NanamiNeural", "ja-JP-KeitaNeural",
-                    "ko-KR-SunHiNeural", "ko-KR-InJoonNeural",
-                    "zh-CN-XiaoxiaoNeural", "zh-CN-YunxiNeural"
-                };
-
-                foreach (var v in commonEdgeVoices)
+                foreach (var v in CommonEdgeVoices)
                 {
                     // Extract locale from name (e.g. en-US from en-US-AriaNeural)
                     var parts = v.Split('-');
                     string locale = parts.Length >= 2 ? $"{parts[0]}-{parts[1]}" : "en-US";
                     
-                    voiceList.Add(new VoiceViewModel { Name = v + suffix, Id = v, FlagPath = GetFlagPath(locale), Locale = locale });
+                    voiceList.Add(new VoiceViewModel { Name = v + suffix, Id = v, Flag = GetFlag(locale), Locale = locale });
                 }
             }
-            catch (Exception ex)
-            {
-                MessageBox.Show($"Failed to load Edge voices: {ex.Message}");
-            }
-            }
         }
         else // AWS
         {
             bool loaded = false;
             try
             {
-                var regionStr = (RegionCombo.SelectedItem as ComboBoxItem)?.Content?.ToString() ?? "us-east-1";
-                var regionEndpoint = RegionEndpoint.GetBySystemName(regionStr);
-                
-                AmazonPollyClient client;
-                var ak = KeyBox.Text.Trim();
-                var sk = SecretBox.Password.Trim();
-                
-                if (!string.IsNullOrEmpty(ak) && !string.IsNullOrEmpty(sk))
-                    client = new AmazonPollyClient(ak, sk, regionEndpoint);
-                else
-                    client = new AmazonPollyClient(regionEndpoint);
-
-                var req = new DescribeVoicesRequest();
-                var resp = await client.DescribeVoicesAsync(req);
-                
-                if (resp.Voices.Count > 0)
-                {
-                    foreach (var v in resp.Voices)
-                    {
-                        voiceList.Add(new VoiceViewModel { Name = $"{v.Name} ({v.Gender})", Id = v.Id, FlagPath = GetFlagPath(v.LanguageCode), Locale = v.LanguageCode });
-                    }
-                    loaded = true;
-                }
+                loaded = await AddPollyVoicesAsync(voiceList, refresh);
             }
             catch { /* Fallback */ }
 
             if (!loaded)
             {
-                var commonVoices = new[] { "Joanna", "Matthew", "Ivy", "Justin", "Kendra", "Joey", "Salli", "Kimberly" };
-                foreach (var v in commonVoices)
+                foreach (var v in CommonPollyVoices)
                 {
-                    voiceList.Add(new VoiceViewModel { Name = v, Id = v, FlagPath = GetFlagPath("en-US"), Locale = "en-US" });
+                    voiceList.Add(new VoiceViewModel { Name = v, Id = v, Flag = GetFlag("en-US"), Locale = "en-US" });
                 }
             }
         }
@@ -251,13 +275,31 @@ public partial class SettingsWindow : Window
             .ThenBy(v => v.Name)
             .ToList();
 
+        // Ids are unique per provider; keep the first (highest-priority) entry if a list repeats one.
+        // The provider's preferred default voices are picked up in the same pass.
+        var voicesById = new Dictionary<string, VoiceViewModel>(sorted.Count, StringComparer.Ordinal);
+        VoiceViewModel? maisie = null, zira = null, david = null;
         foreach (var v in sorted)
         {
-            VoiceCombo.Items.Add(v);
+            voicesById.TryAdd(v.Id, v);
+
+            if (provider == "Edge")
+            {
+                if (maisie == null && (v.Id.Contains("Maisie", StringComparison.OrdinalIgnoreCase)
+                                    || v.Name.Contains("Maisie", StringComparison.OrdinalIgnoreCase))) maisie = v;
+            }
+            else if (provider == "System")
+            {
+                if (zira == null && v.Id.Contains("Zira", StringComparison.OrdinalIgnoreCase)) zira = v;
+                if (david == null && v.Id.Contains("David", StringComparison.OrdinalIgnoreCase)) david = v;
+            }
         }
         
+        // Hand the combo the finished list in one go instead of a change notification per voice.
+        VoiceCombo.ItemsSource = sorted;
+
         // Restore selection
-        if (VoiceCombo.Items.Count > 0)
+        if (sorted.Count > 0)
         {
             VoiceViewModel? match = null;
             
@@ -265,48 +307,88 @@ public partial class SettingsWindow : Window
             var savedVoice = _env?.Get("POLLY_VOICE_ID");
             if (!string.IsNullOrEmpty(savedVoice))
             {
-                match = VoiceCombo.Items.OfType<VoiceViewModel>().FirstOrDefault(i => i.Id == savedVoice);
+                voicesById.TryGetValue(savedVoice, out match);
             }
 
             // 2. If Edge and no match (or no saved voice), try "Maisie"
-            if (match == null && provider == "Edge")
-            {
-                 match = VoiceCombo.Items.OfType<VoiceViewModel>()
-                         .FirstOrDefault(i => i.Id.Contains("Maisie", StringComparison.OrdinalIgnoreCase) 
-                                           || i.Name.Contains("Maisie", StringComparison.OrdinalIgnoreCase));
-            }
-
             // 2b. If System and no match, try Zira or David
-            if (match == null && provider == "System")
-            {
-                 match = VoiceCombo.Items.OfType<VoiceViewModel>()
-                         .FirstOrDefault(i => i.Id.Contains("Zira", StringComparison.OrdinalIgnoreCase));
-                 
-                 if (match == null)
-                 {
-                     match = VoiceCombo.Items.OfType<VoiceViewModel>()
-                             .FirstOrDefault(i => i.Id.Contains("David", StringComparison.OrdinalIgnoreCase));
-                 }
-            }
+            match ??= maisie ?? zira ?? david;
 
             // 3. Fallback to first item
-            if (match == null)
-            {
-                match = VoiceCombo.Items.OfType<VoiceViewModel>().FirstOrDefault();
-            }
+            match ??= sorted[0];
 
-            if (match != null)
-            {
-                VoiceCombo.SelectedItem = match;
-            }
+            VoiceCombo.SelectedItem = match;
         }
     }
 
+    // Kept out of LoadVoicesForProviderAsync so the AWS SDK's types (and assemblies) are only
+    // loaded when the Polly provider is actually shown.
+    private async Task<bool> AddPollyVoicesAsync(List<VoiceViewModel> voiceList, bool refresh)
+    {
+        var regionStr = (RegionCombo.SelectedItem as ComboBoxItem)?.Content?.ToString() ?? "us-east-1";
+        var ak = KeyBox.Text.Trim();
+        var sk = SecretBox.Password.Trim();
+
+        // Reuses TtsService's client and cached catalog instead of a fresh DescribeVoices per open.
+        // Run on the pool: building the first client loads AWS config synchronously.
+        var ttsService = _ttsService;
+        var voices = ttsService != null
+            ? await Task.Run(() => ttsService.GetPollyVoicesAsync(regionStr, ak, sk, refresh))
+            : new List<Voice>();
+
+        foreach (var v in voices)
+        {
+            voiceList.Add(new VoiceViewModel { Name = $"{v.Name} ({v.Gender})", Id = v.Id, Flag = GetFlag(v.LanguageCode), Locale = v.LanguageCode });
+        }
+        return voices.Count > 0;
+    }
+
+    // One decoded, frozen bitmap per flag shared by every voice row; binding a pack URI string
+    // made WPF load and decode the PNG again for each of the hundreds of voices.
+    private static readonly Dictionary<string, ImageSource?> FlagCache = new();
+    // Locale -> flag, so repeat locales skip the path mapping as well as the decode.
+    private static readonly Dictionary<string, ImageSource?> FlagsByLocale = new();
+
+    private ImageSource? GetFlag(string locale)
+    {
+        if (FlagsByLocale.TryGetValue(locale, out var known)) return known;
+
+        var path = GetFlagPath(locale);
+        if (!FlagCache.TryGetValue(path, out var image))
+        {
+            image = LoadFlag(path) ?? (path == EarthIconPath ? null : GetFlag(""));
+            FlagCache[path] = image;
+        }
+        FlagsByLocale[locale] = image;
+        return image;
+    }
+
+    private static ImageSource? LoadFlag(string path)
+    {
+        try
+        {
+            var bitmap = new BitmapImage();
+            bitmap.BeginInit();
+            bitmap.UriSource = new Uri(path);
+            bitmap.DecodePixelWidth = 40; // 2x the 20px template width; flags ship at 96px
+            bitmap.CacheOption = BitmapCacheOption.OnLoad;
+            bitmap.EndInit();
+            bitmap.Freeze();
+            return bitmap;
+        }
+        catch
+        {
+            return null; // No flag for this region
+        }
+    }
+
+    private const string EarthIconPath = "pack://application:,,,/wwwroot/static/icons/earth.png";
+
     private string GetFlagPath(string locale)
     {
         // Simple mapping from locale to flag code
         // locale example: en-US, fr-FR
-        if (string.IsNullOrEmpty(locale)) return "pack://application:,,,/wwwroot/static/icons/earth.png";
+        if (string.IsNullOrEmpty(locale)) return EarthIconPath;
 
         var countryCode = locale.Split('-').Last().ToLower();
         
@@ -324,7 +406,7 @@ public partial class SettingsWindow : Window
     {
         public string Name { get; set; } = "";
         public string Id { get; set; } = "";
-        public string FlagPath { get; set; } = "";
+        public ImageSource? Flag { get; set; }
         public string Locale { get; set; } = "";
         
         public override string ToString() => Name;
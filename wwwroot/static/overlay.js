@@ -477,20 +477,83 @@
       display.classList.add('show');
     } catch (e) { /* noop */ }
   }
-  function showAnimatedNumber(score, level, durationMs, quote = '', audioUrl = '', effects = null) {
-    // Fixed banner display durations for predictable pacing
-    const NO_AUDIO_HOLD_MS = 2000;  // Overlay hold when no audio is selected
-    const AFTER_AUDIO_MS = 2000;     // Additional hold after audio finishes
-    function hideOverlay() {
-      display.classList.remove('show');
-      display.classList.add('hidden');
-      quoteDisplay.classList.remove('show');
-      // Clean up any overlay-root effect classes so special visuals vanish
-      try {
-        const root = $('overlay-root');
-        if (root) { root.classList.remove(...overlayEffects); }
-      } catch (e) { /* ignore */ }
-    }
+  // Fixed banner display durations for predictable pacing
+  const NO_AUDIO_HOLD_MS = 2000;  // Overlay hold when no audio is selected
+  const AFTER_AUDIO_MS = 2000;     // Additional hold after audio finishes
+  const AUDIO_WAIT_MS = 10000;     // Max hold while a cache-miss clip is still synthesizing
+  // Vote whose audio is still being generated; its audio_ready event starts playback
+  let pendingAudioVoteId = null;
+  let pendingAudioEffects = null;
+
+  function hideOverlay() {
+    pendingAudioVoteId = null;
+    display.classList.remove('show');
+    display.classList.add('hidden');
+    quoteDisplay.classList.remove('show');
+    // Clean up any overlay-root effect classes so special visuals vanish
+    try {
+      const root = $('overlay-root');
+      if (root) { root.classList.remove(...overlayEffects); }
+    } catch (e) { /* ignore */ }
+  }
+
+  function stopQuoteAudio() {
+    try {
+      quoteAudio.pause();
+      quoteAudio.currentTime = 0;
+      quoteAudio.src = '';
+    } catch (e) { /* ignore */ }
+  }
+
+  function playQuoteAudio(audioUrl, effects) {
+    // Playback owns the banner from here: onended (or a failed play) sets the hide timer.
+    // Drop any pending one, e.g. the AUDIO_WAIT_MS hold from a cache miss, so a late or
+    // long clip isn't cut off mid-quote.
+    if (displayTimer) { clearTimeout(displayTimer); displayTimer = null; }
+    initAudioGraph();
+    configureEffects(effects);
+    try { if (audioCtx && audioCtx.state !== 'running') { audioCtx.resume().catch(() => {}); } } catch (e) {}
+    // Start muted to satisfy autoplay policies, then unmute shortly after
+    try {
+      quoteAudio.muted = true;
+      quoteAudio.volume = 1.0;
+    } catch (e) {}
+    quoteAudio.src = audioUrl;
+    // Ensure the media element reloads the new source before playing
+    try { quoteAudio.load(); } catch (e) {}
+    // Hide 2 seconds after audio finishes
+    quoteAudio.onended = () => {
+      if (!previewActive) {
+        if (displayTimer) { clearTimeout(displayTimer); displayTimer = null; }
+        displayTimer = setTimeout(() => { hideOverlay(); }, AFTER_AUDIO_MS);
+      }
+    };
+    quoteAudio.play()
+      .then(() => {
+        // Attempt to unmute shortly after playback begins; if audioCtx is
+        // still suspended, the element path should produce audible sound.
+        try {
+          setTimeout(() => {
+            quoteAudio.muted = false;
+          }, 150);
+        } catch (e) { /* ignore */ }
+      })
+      .catch(e => {
+      console.log('Audio playback failed:', e);
+      if (audioCtx && audioCtx.state === 'suspended') {
+        audioCtx.resume().catch(() => {});
+      }
+      // Autoplay may be blocked in regular browsers; OBS Browser Source is unaffected
+      // Fallback to fixed banner duration if audio didn't play
+      if (!previewActive) {
+        if (displayTimer) { clearTimeout(displayTimer); displayTimer = null; }
+        displayTimer = setTimeout(() => { hideOverlay(); }, NO_AUDIO_HOLD_MS);
+      }
+    });
+  }
+
+  function showAnimatedNumber(score, level, durationMs, quote = '', audioUrl = '', effects = null, audioPending = false, voteId = null) {
+    pendingAudioVoteId = null;
     // Clear previous timer
     if (displayTimer) {
       clearTimeout(displayTimer);
@@ -555,53 +618,19 @@
 
     // Play audio only if available and TTS is enabled
     if (audioUrl && ttsEnabled) {
-      initAudioGraph();
-      configureEffects(effects);
-      try { if (audioCtx && audioCtx.state !== 'running') { audioCtx.resume().catch(() => {}); } } catch (e) {}
-      // Start muted to satisfy autoplay policies, then unmute shortly after
-      try {
-        quoteAudio.muted = true;
-        quoteAudio.volume = 1.0;
-      } catch (e) {}
-      quoteAudio.src = audioUrl;
-      // Ensure the media element reloads the new source before playing
-      try { quoteAudio.load(); } catch (e) {}
-      // Hide 2 seconds after audio finishes
-      quoteAudio.onended = () => {
-        if (!previewActive) {
-          if (displayTimer) { clearTimeout(displayTimer); displayTimer = null; }
-          displayTimer = setTimeout(() => { hideOverlay(); }, AFTER_AUDIO_MS);
-        }
-      };
-      quoteAudio.play()
-        .then(() => {
-          // Attempt to unmute shortly after playback begins; if audioCtx is
-          // still suspended, the element path should produce audible sound.
-          try {
-            setTimeout(() => {
-              quoteAudio.muted = false;
-            }, 150);
-          } catch (e) { /* ignore */ }
-        })
-        .catch(e => {
-        console.log('Audio playback failed:', e);
-        if (audioCtx && audioCtx.state === 'suspended') {
-          audioCtx.resume().catch(() => {});
-        }
-        // Autoplay may be blocked in regular browsers; OBS Browser Source is unaffected
-        // Fallback to fixed banner duration if audio didn't play
-        if (!previewActive) {
-          if (displayTimer) { clearTimeout(displayTimer); displayTimer = null; }
-          displayTimer = setTimeout(() => { hideOverlay(); }, NO_AUDIO_HOLD_MS);
-        }
-      });
+      playQuoteAudio(audioUrl, effects);
+    } else if (audioPending && ttsEnabled) {
+      // Clip is still synthesizing: hold the banner until audio_ready arrives (or give up)
+      stopQuoteAudio();
+      pendingAudioVoteId = voteId;
+      pendingAudioEffects = effects;
+      if (!previewActive) {
+        if (displayTimer) { clearTimeout(displayTimer); displayTimer = null; }
+        displayTimer = setTimeout(() => { hideOverlay(); }, AUDIO_WAIT_MS);
+      }
     } else {
       // No audio or TTS disabled: force-stop any previous playback and use fixed duration
-      try {
-        quoteAudio.pause();
-        quoteAudio.currentTime = 0;
-        quoteAudio.src = '';
-      } catch (e) { /* ignore */ }
+      stopQuoteAudio();
       // Show overlay for 2 seconds after animation finishes (giving time to read the quote)
       if (!previewActive) {
         if (displayTimer) { clearTimeout(displayTimer); displayTimer = null; }
@@ -613,6 +642,10 @@
     }
   }
 
+    const RECONNECT_MIN_MS = 1000;
+    const RECONNECT_MAX_MS = 30000;
+    let reconnectDelayMs = RECONNECT_MIN_MS;
+
     function connectSSE() {
       const es = new EventSource('/stream');
       es.onmessage = (evt) => {
@@ -636,7 +669,13 @@
             }
           } catch (e) { /* ignore */ }
           console.log(`Vote: TTS=${ttsEnabled}, hasAudio=${!!payload.audio_url}, audioUrl=${payload.audio_url || 'none'}`);
-          showAnimatedNumber(payload.score, payload.level, payload.duration_ms, payload.quote, payload.audio_url, payload.effects || null);
+          showAnimatedNumber(payload.score, payload.level, payload.duration_ms, payload.quote, payload.audio_url, payload.effects || null, !!payload.audio_pending, payload.vote_id);
+          } else if (payload.type === 'audio_ready') {
+            // Late audio for a vote already on screen; ignore it if a newer vote replaced it
+            if (payload.vote_id === pendingAudioVoteId && payload.audio_url && ttsEnabled) {
+              pendingAudioVoteId = null;
+              playQuoteAudio(payload.audio_url, pendingAudioEffects);
+            }
           } else if (payload.type === 'theme') {
             try {
               const deg = parseInt(payload.hue_deg || 0);
@@ -720,8 +759,16 @@
         // ignore parse errors
       }
     };
+    es.onopen = () => {
+      reconnectDelayMs = RECONNECT_MIN_MS;
+    };
     es.onerror = () => {
-      // Let browser auto-reconnect; no manual handling needed
+      // Reconnect ourselves with a growing, jittered delay instead of the browser's fixed retry,
+      // so an overlay left open while the app is closed doesn't hammer the port.
+      es.close();
+      const delay = reconnectDelayMs + Math.random() * 250;
+      reconnectDelayMs = Math.min(reconnectDelayMs * 2, RECONNECT_MAX_MS);
+      setTimeout(connectSSE, delay);
     };
   }
 